@@ -0,0 +1,174 @@
+"""
+answer_cache.py
+
+Semantic cache for RAG answers.
+
+A question is looked up with the embedding that rag.embed_text already
+computes: if a stored question with the same generation settings
+(model, temperature, top-k, collection, embedding model) and the same
+chat history has a cosine similarity >= threshold, its answer and
+citations are returned without retrieval nor LLM call.
+
+- embeddings are normalized, so cosine = one dot product per entry
+- LRU eviction above max_entries, entries older than ttl seconds expire
+- optional JSON persistence (written atomically after every new entry)
+- hit / miss counters and the LLM time saved by the hits
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    question: str
+    embedding: np.ndarray
+    answer: str
+    citations: List[str]
+    created: float
+    latency: float  # seconds the original answer took
+
+
+def history_fingerprint(history: List[Dict], question: str) -> str:
+    """Hash of the chat history, without the current question if it is the last message."""
+    if history and history[-1].get("role") == "user" and history[-1].get("content") == question:
+        history = history[:-1]
+    turns = [[m.get("role"), m.get("content")] for m in history]
+    return hashlib.sha1(json.dumps(turns, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def cache_key(s, history: List[Dict], question: str) -> str:
+    """Everything besides the question that changes the answer."""
+    parts = [s.model_id, f"{s.temperature:.3f}", str(s.top_k), s.collection_name, s.embedding_model,
+             history_fingerprint(history, question)]
+    return "|".join(parts)
+
+
+class AnswerCache:
+    """Semantic answer cache (see module docstring). Thread-safe."""
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        path: Optional[str] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.entries: "OrderedDict[int, CacheEntry]" = OrderedDict()  # oldest first
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _expired(self, e: CacheEntry, now: float) -> bool:
+        return self.ttl is not None and now - e.created > self.ttl
+
+    def get(self, s, question: str, history: List[Dict], q_emb) -> Optional[Tuple[str, List[str]]]:
+        """(answer, citations) of the closest cached question, or None."""
+        t0 = time.perf_counter()
+        key = cache_key(s, history, question)
+        now = time.time()
+        with self._lock:
+            for i in [i for i, e in self.entries.items() if self._expired(e, now)]:
+                del self.entries[i]
+            ids = [i for i, e in self.entries.items() if e.key == key]
+            if ids:
+                embs = np.stack([self.entries[i].embedding for i in ids])
+                sims = embs @ np.asarray(q_emb, dtype=np.float32)
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    entry = self.entries[ids[best]]
+                    self.entries.move_to_end(ids[best])
+                    self.hits += 1
+                    self.saved_seconds += max(0.0, entry.latency - (time.perf_counter() - t0))
+                    return entry.answer, list(entry.citations)
+            self.misses += 1
+        return None
+
+    def put(self, s, question: str, history: List[Dict], q_emb, answer: str, citations: List[str],
+            latency: float) -> None:
+        """Store an answer; evicts the least recently used entries above max_entries."""
+        entry = CacheEntry(
+            key=cache_key(s, history, question),
+            question=question,
+            embedding=np.asarray(q_emb, dtype=np.float32),
+            answer=answer,
+            citations=list(citations),
+            created=time.time(),
+            latency=latency,
+        )
+        with self._lock:
+            self.entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if self.path:
+                self._save(self.path)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "saved_seconds": self.saved_seconds,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            if self.path:
+                self._save(self.path)
+
+    def save(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            self._save(path or self.path)
+
+    def _save(self, path: str) -> None:
+        rows = [{
+            "key": e.key,
+            "question": e.question,
+            "embedding": e.embedding.tolist(),
+            "answer": e.answer,
+            "citations": e.citations,
+            "created": e.created,
+            "latency": e.latency,
+        } for e in self.entries.values()]
+        # write + rename: a crash never leaves a half-written cache file
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": rows}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)["entries"]
+        with self._lock:
+            for r in rows:
+                r["embedding"] = np.asarray(r["embedding"], dtype=np.float32)
+                self.entries[self._next_id] = CacheEntry(**r)
+                self._next_id += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
@@ -8,15 +8,20 @@ Streamlit web app with 3 pages (as required):
 
 We connect to LM Studio Local Server and allow the user
 to choose between two locally downloaded models.
+
+The embedder and the vector DB are loaded once per server process at
+startup (st.cache_resource), so a question only pays for embed + search + LLM.
 """
 
 from __future__ import annotations
 
+from statistics import median
 from typing import Dict, List
 import requests
 import streamlit as st
 
-from rag import Settings, answer_with_rag
+from answer_cache import AnswerCache
+from rag import Settings, answer_with_rag, answer_with_rag_stream, warm_up
 
 
 DEFAULT_MODELS = [
@@ -31,9 +36,70 @@ def init_state() -> None:
     st.session_state.setdefault("model_id", DEFAULT_MODELS[0])
     st.session_state.setdefault("temperature", 0.2)
     st.session_state.setdefault("top_k", 3)
+    st.session_state.setdefault("stream", True)
+    st.session_state.setdefault("use_cache", True)
     st.session_state.setdefault("messages", [])  # chat history
 
 
+def current_settings() -> Settings:
+    """RAG settings from the sidebar / model page widgets."""
+    return Settings(
+        lm_base_url=st.session_state["lm_base_url"],
+        model_id=st.session_state["model_id"],
+        temperature=float(st.session_state["temperature"]),
+        top_k=int(st.session_state["top_k"]),
+    )
+
+
+@st.cache_resource(show_spinner="Loading embedding model and vector DB…")
+def warm_up_resources(chroma_dir: str, collection_name: str, embedding_model: str) -> Dict[str, float]:
+    """Load the RAG resources once per process (shared by all sessions); returns the load timings."""
+    s = Settings(
+        lm_base_url="",
+        model_id="",
+        chroma_dir=chroma_dir,
+        collection_name=collection_name,
+        embedding_model=embedding_model,
+    )
+    return warm_up(s)
+
+
+@st.cache_resource
+def answer_cache() -> AnswerCache:
+    """Semantic answer cache shared by all sessions, persisted next to the vector DB."""
+    return AnswerCache(threshold=0.95, max_entries=1000, ttl=7 * 24 * 3600, path="answer_cache.json")
+
+
+@st.cache_resource
+def latency_log() -> Dict:
+    """Answer latencies of this process: the first answer is kept apart from the steady state."""
+    return {"first": None, "steady": []}
+
+
+def record_latency(seconds: float) -> None:
+    log = latency_log()
+    if log["first"] is None:
+        log["first"] = seconds
+    else:
+        log["steady"].append(seconds)
+
+
+def sidebar_latency(warmup: Dict[str, float]) -> None:
+    """Show warm-up time, time-to-first-answer and steady-state latency."""
+    st.sidebar.header("Latence")
+    st.sidebar.caption(f"Warm-up (modèle + base) : {sum(warmup.values()):.2f}s")
+    log = latency_log()
+    if log["first"] is not None:
+        st.sidebar.caption(f"1re réponse : {log['first']:.2f}s")
+    if log["steady"]:
+        st.sidebar.caption(f"Régime établi : médiane {median(log['steady']):.2f}s sur {len(log['steady'])} réponses")
+    stats = answer_cache().stats()
+    st.sidebar.caption(
+        f"Cache : {stats['hits']} hits / {stats['hits'] + stats['misses']} questions "
+        f"({stats['hit_rate']:.0%}), {stats['saved_seconds']:.1f}s gagnées, {stats['entries']} entrées"
+    )
+
+
 def ping_lmstudio(base_url: str) -> bool:
     """Check if LM Studio server is reachable."""
     try:
@@ -61,6 +127,16 @@ def sidebar_controls() -> None:
     st.sidebar.header("RAG / génération")
     st.session_state["top_k"] = st.sidebar.slider("Top-K sources", 1, 8, st.session_state["top_k"])
     st.session_state["temperature"] = st.sidebar.slider("Température", 0.0, 1.0, st.session_state["temperature"])
+    st.session_state["stream"] = st.sidebar.toggle(
+        "Streaming",
+        value=st.session_state["stream"],
+        help="Affiche la réponse token par token (les sources s'affichent tout de suite).",
+    )
+    st.session_state["use_cache"] = st.sidebar.toggle(
+        "Cache des réponses",
+        value=st.session_state["use_cache"],
+        help="Réutilise la réponse d'une question quasi identique (même modèle, température, top-k et historique).",
+    )
 
     if st.sidebar.button("🧹 Reset chat"):
         st.session_state["messages"] = []
@@ -121,20 +197,34 @@ def page_chat() -> None:
 
     st.session_state["messages"].append({"role": "user", "content": question})
 
-    s = Settings(
-        lm_base_url=st.session_state["lm_base_url"],
-        model_id=st.session_state["model_id"],
-        temperature=float(st.session_state["temperature"]),
-        top_k=int(st.session_state["top_k"]),
-    )
+    s = current_settings()
 
+    history = history_for_llm(st.session_state["messages"])
+    cache = answer_cache() if st.session_state["use_cache"] else None
+    timings: Dict[str, float] = {}
     with st.chat_message("assistant"):
-        with st.spinner("Thinking…"):
-            answer, cites = answer_with_rag(s, question, history_for_llm(st.session_state["messages"]))
-        st.markdown(answer)
-        with st.expander("Sources used"):
+        if st.session_state["stream"]:
+            # sources first (known right after retrieval), then the tokens as they come
+            with st.spinner("Searching…"):
+                tokens, cites = answer_with_rag_stream(s, question, history, timings, cache)
+            sources = st.expander("Sources used")
+            for c in cites:
+                sources.write(c)
+            answer = st.write_stream(tokens)
+        else:
+            with st.spinner("Thinking…"):
+                answer, cites = answer_with_rag(s, question, history, timings, cache)
+            st.markdown(answer)
+            sources = st.expander("Sources used")
             for c in cites:
-                st.write(c)
+                sources.write(c)
+        record_latency(timings["total"])
+        first_token = f"first token {timings['first_token']:.2f}s · " if "first_token" in timings else ""
+        cached = "cache hit · " if timings.get("cache_hit") else ""
+        sources.caption(
+            f"{cached}embed {timings['embed']:.2f}s · retrieve {timings['retrieve']:.2f}s · "
+            f"{first_token}LLM {timings['llm']:.2f}s · total {timings['total']:.2f}s"
+        )
 
     st.session_state["messages"].append({"role": "assistant", "content": answer})
 
@@ -143,6 +233,8 @@ def main() -> None:
     """Main router: simple navigation between the 3 pages."""
     st.set_page_config(page_title="Othello Chatbot", layout="wide")
     init_state()
+    s = current_settings()
+    warmup = warm_up_resources(s.chroma_dir, s.collection_name, s.embedding_model)
     sidebar_controls()
 
     page = st.sidebar.radio("Pages", ["Home", "Chat", "Model Choice"], index=1)
@@ -152,6 +244,8 @@ def main() -> None:
         page_model_choice()
     else:
         page_chat()
+    # after the page, so the answer just given is already counted
+    sidebar_latency(warmup)
 
 
 if __name__ == "__main__":
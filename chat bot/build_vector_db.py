@@ -10,14 +10,38 @@ Build a local ChromaDB vector database for Othello:
 - Store (chunk_text + embedding + metadata) into ChromaDB
 
 This script is a one-time (or occasional) preprocessing step.
+
+The build is a streaming pipeline, so memory stays bounded whatever the
+corpus size:
+- chunks come from a generator (iter_chunks)
+- they are grouped in upsert batches of cfg.upsert_batch chunks
+- each batch is embedded cfg.encode_batch texts at a time (optionally on
+  several CPU processes) and sent to Chroma as a float32 NumPy array
+
+Re-indexing is incremental: a chunk's id is a hash of its text, and a
+manifest (chroma_dir/index_manifest.json) lists the ids stored in the
+collection. Only new chunks are embedded, ids no longer produced by the
+text are deleted, and an unchanged text costs one chunking pass (the
+model is not even loaded). The manifest is saved after every batch, so
+an interrupted build resumes where it stopped.
+
+    python build_vector_db.py [--encode-batch 64] [--upsert-batch 256] [--processes 4] [--rebuild]
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import os
 import re
+import time
+
+import numpy as np
 import requests
 
 import chromadb
@@ -35,6 +59,10 @@ class BuildConfig:
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     chunk_words: int = 420
     overlap_words: int = 60
+    encode_batch: int = 64  # texts per forward pass of the embedder
+    upsert_batch: int = 256  # chunks per Chroma request (and per manifest save)
+    processes: int = 1  # > 1: multi-process encode on CPU
+    manifest_name: str = "index_manifest.json"  # stored in chroma_dir
 
 
 def ensure_data_dir(cfg: BuildConfig) -> None:
@@ -73,23 +101,36 @@ def strip_gutenberg_boilerplate(text: str) -> str:
     return text.strip()
 
 
-def chunk_words(text: str, chunk_size: int, overlap: int) -> List[Tuple[int, str]]:
+def iter_chunks(text: str, chunk_size: int, overlap: int) -> Iterator[Tuple[int, str]]:
     """
-    Split text into (chunk_id, chunk_text).
+    Yield (chunk_id, chunk_text) one chunk at a time.
 
     We chunk by words because it is simple and robust.
     """
     words = text.split()
-    out: List[Tuple[int, str]] = []
     step = max(1, chunk_size - overlap)
     chunk_id = 0
     for i in range(0, len(words), step):
         chunk = words[i : i + chunk_size]
         if len(chunk) < 50:
             break
-        out.append((chunk_id, " ".join(chunk)))
+        yield chunk_id, " ".join(chunk)
         chunk_id += 1
-    return out
+
+
+def chunk_words(text: str, chunk_size: int, overlap: int) -> List[Tuple[int, str]]:
+    """Split text into a list of (chunk_id, chunk_text)."""
+    return list(iter_chunks(text, chunk_size, overlap))
+
+
+def batched(items: Iterable, n: int) -> Iterator[list]:
+    """Consecutive lists of n items (the last one may be shorter)."""
+    it = iter(items)
+    while True:
+        batch = list(islice(it, n))
+        if not batch:
+            return
+        yield batch
 
 
 def get_embedder(cfg: BuildConfig) -> SentenceTransformer:
@@ -97,37 +138,165 @@ def get_embedder(cfg: BuildConfig) -> SentenceTransformer:
     return SentenceTransformer(cfg.embedding_model)
 
 
-def get_collection(cfg: BuildConfig):
+def get_client(cfg: BuildConfig):
+    """Persistent ChromaDB client, the DB is stored on disk in cfg.chroma_dir."""
+    return chromadb.PersistentClient(path=str(cfg.chroma_dir))
+
+
+def get_collection(cfg: BuildConfig, client=None):
     """
     Create/load a persistent ChromaDB collection.
 
     The DB is stored on disk in cfg.chroma_dir.
     """
-    client = chromadb.PersistentClient(path=str(cfg.chroma_dir))
+    client = client or get_client(cfg)
     return client.get_or_create_collection(name=cfg.collection_name)
 
 
-def upsert_chunks(col, chunks: List[Tuple[int, str]], emb_model: SentenceTransformer) -> None:
+def encode(emb_model: SentenceTransformer, docs: List[str], batch_size: int, pool=None) -> np.ndarray:
+    """Normalized float32 embeddings of docs, on the multi-process pool if given."""
+    if pool is not None:
+        embs = emb_model.encode_multi_process(docs, pool, batch_size=batch_size, normalize_embeddings=True)
+    else:
+        embs = emb_model.encode(docs, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
+    return np.asarray(embs, dtype=np.float32)
+
+
+def chunk_key(chunk_text: str) -> str:
+    """Chroma id of a chunk: a hash of its text, so an edit only changes the ids of the chunks it touches."""
+    return "chunk_" + hashlib.sha256(chunk_text.encode("utf-8")).hexdigest()[:24]
+
+
+def upsert_chunks(
+    col, chunks: List[Tuple[int, str]], emb_model: SentenceTransformer, batch_size: int = 64, pool=None
+) -> None:
     """Compute embeddings and store them with metadata in ChromaDB."""
-    ids = [f"chunk_{cid}" for cid, _ in chunks]
+    ids = [chunk_key(txt) for _, txt in chunks]
     docs = [txt for _, txt in chunks]
-    embs = emb_model.encode(docs, normalize_embeddings=True).tolist()
+    embs = encode(emb_model, docs, batch_size, pool)
     metas = [{"source": "Othello", "chunk_id": cid} for cid, _ in chunks]
     col.upsert(ids=ids, documents=docs, embeddings=embs, metadatas=metas)
 
 
-def main() -> None:
-    """Entry point: build the vector DB from scratch (idempotent upsert)."""
-    cfg = BuildConfig()
+def load_manifest(path: Path, cfg: BuildConfig) -> Optional[Dict[str, int]]:
+    """
+    {chunk key: chunk_id} of what the collection holds, or None when there is
+    no usable manifest (missing, unreadable, or built with another model).
+    """
+    if not path.exists():
+        return None
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if state.get("collection") != cfg.collection_name or state.get("embedding_model") != cfg.embedding_model:
+        return None
+    return {k: int(v) for k, v in state.get("chunks", {}).items()}
+
+
+def save_manifest(path: Path, cfg: BuildConfig, chunks: Dict[str, int]) -> None:
+    """Write the manifest atomically (write + rename)."""
+    state = {"collection": cfg.collection_name, "embedding_model": cfg.embedding_model, "chunks": chunks}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def build(cfg: BuildConfig, text: str, rebuild: bool = False) -> Dict[str, int]:
+    """
+    Bring the collection in line with text, embedding only what changed.
+
+    - chunks whose key is not in the manifest are embedded and upserted
+    - chunks that only moved get their chunk_id metadata updated
+    - keys that are no longer in the text are deleted, and so is any id
+      in the collection that the manifest does not list
+    The manifest is saved after every batch, so an interrupted build
+    resumes with the chunks still missing.
+
+    Returns the counts of added / moved / deleted / unchanged chunks.
+    """
+    client = get_client(cfg)
+    col = get_collection(cfg, client)
+    path = cfg.chroma_dir / cfg.manifest_name
+    manifest = None if rebuild else load_manifest(path, cfg)
+    if manifest is None:
+        # unknown content (first build, other model, legacy positional ids): drop it all
+        manifest = {}
+    # every id the manifest does not list is dropped, checked on every run:
+    # an interrupted wipe (or upsert) is finished by the next build
+    stale_ids = [i for i in col.get(include=[])["ids"] if i not in manifest]
+
+    # current chunks: key -> chunk_id (first occurrence of duplicated text)
+    current: Dict[str, int] = {}
+    for cid, txt in iter_chunks(text, cfg.chunk_words, cfg.overlap_words):
+        current.setdefault(chunk_key(txt), cid)
+
+    stale_ids += [k for k in manifest if k not in current]
+    moved = [k for k, cid in current.items() if k in manifest and manifest[k] != cid]
+    counts = {"added": 0, "moved": len(moved), "deleted": len(stale_ids),
+              "unchanged": sum(1 for k in current if k in manifest) - len(moved)}
+
+    # Chroma refuses requests above the client's max batch size
+    upsert_batch = max(1, min(cfg.upsert_batch, client.get_max_batch_size()))
+
+    for ids in batched(stale_ids, upsert_batch):
+        col.delete(ids=ids)
+        for k in ids:
+            manifest.pop(k, None)
+        save_manifest(path, cfg, manifest)
+
+    for ids in batched(moved, upsert_batch):
+        col.update(ids=ids, metadatas=[{"source": "Othello", "chunk_id": current[k]} for k in ids])
+        manifest.update((k, current[k]) for k in ids)
+        save_manifest(path, cfg, manifest)
+
+    # second pass over the generator: only the texts to embed are materialized, one batch at a time
+    todo = (
+        (cid, txt) for cid, txt in iter_chunks(text, cfg.chunk_words, cfg.overlap_words)
+        if current.get(chunk_key(txt)) == cid and chunk_key(txt) not in manifest
+    )
+    embedder = None
+    pool = None
+    t0 = time.perf_counter()
+    try:
+        for batch in batched(todo, upsert_batch):
+            if embedder is None:
+                # nothing new to embed = the model is never loaded
+                embedder = get_embedder(cfg)
+                pool = embedder.start_multi_process_pool(["cpu"] * cfg.processes) if cfg.processes > 1 else None
+            upsert_chunks(col, batch, embedder, cfg.encode_batch, pool)
+            manifest.update((chunk_key(txt), cid) for cid, txt in batch)
+            save_manifest(path, cfg, manifest)
+            counts["added"] += len(batch)
+            print(f"  {counts['added']} chunks embedded ({counts['added'] / (time.perf_counter() - t0):.1f} chunks/s)")
+    finally:
+        if pool is not None:
+            embedder.stop_multi_process_pool(pool)
+    save_manifest(path, cfg, manifest)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point: build or incrementally update the vector DB."""
+    defaults = BuildConfig()
+    ap = argparse.ArgumentParser(description="Build the Othello ChromaDB vector database.")
+    ap.add_argument("--encode-batch", type=int, default=defaults.encode_batch, help="texts per encode call")
+    ap.add_argument("--upsert-batch", type=int, default=defaults.upsert_batch, help="chunks per Chroma request")
+    ap.add_argument("--processes", type=int, default=defaults.processes, help="CPU processes for encoding")
+    ap.add_argument("--rebuild", action="store_true", help="ignore the manifest and re-embed everything")
+    args = ap.parse_args(argv)
+    cfg = BuildConfig(encode_batch=args.encode_batch, upsert_batch=args.upsert_batch, processes=args.processes)
+
+    t0 = time.perf_counter()
     raw = fetch_othello_text(cfg)
     clean = strip_gutenberg_boilerplate(raw)
-    chunks = chunk_words(clean, cfg.chunk_words, cfg.overlap_words)
-
-    embedder = get_embedder(cfg)
-    col = get_collection(cfg)
-    upsert_chunks(col, chunks, embedder)
+    cfg.chroma_dir.mkdir(parents=True, exist_ok=True)
+    counts = build(cfg, clean, rebuild=args.rebuild)
 
-    print(f"✅ Stored {len(chunks)} chunks into ChromaDB: {cfg.chroma_dir}/{cfg.collection_name}")
+    print(
+        f"✅ ChromaDB {cfg.chroma_dir}/{cfg.collection_name}: {counts['added']} added, {counts['moved']} moved, "
+        f"{counts['deleted']} deleted, {counts['unchanged']} unchanged ({time.perf_counter() - t0:.2f}s)"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+"""
+fake_lmstudio.py
+
+A tiny stand-in for the LM Studio Local Server, to develop / test the app
+without a model loaded:
+- GET  /v1/models
+- POST /v1/chat/completions  (normal JSON, or SSE when "stream": true)
+
+The answer is a canned sentence that echoes the question, sent word by word
+with a configurable delay, so time-to-first-token vs full generation can be
+observed.
+
+    python fake_lmstudio.py --port 1234 --first-token 0.5 --delay 0.05
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+import argparse
+import json
+import time
+
+
+MODELS = ["mistralai/ministral-3-3b", "mistralai/mistral-7b-instruct-v0.3"]
+
+
+def fake_answer(messages: List[Dict]) -> List[str]:
+    """The answer as a list of tokens (words with their trailing space)."""
+    question = messages[-1]["content"].split("Question:")[-1].split("\n")[0].strip() if messages else ""
+    text = f"This is a fake answer to: {question} According to the context, Iago deceives Othello [S1]."
+    words = text.split(" ")
+    return [w + " " for w in words[:-1]] + words[-1:]
+
+
+class Handler(BaseHTTPRequestHandler):
+    first_token = 0.5
+    delay = 0.05
+
+    def _json(self, obj: Dict, status: int = 200) -> None:
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/v1/models":
+            self._json({"object": "list", "data": [{"id": m, "object": "model"} for m in MODELS]})
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._json({"error": "not found"}, 404)
+            return
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        tokens = fake_answer(req.get("messages", []))
+        model = req.get("model", MODELS[0])
+
+        if not req.get("stream"):
+            time.sleep(self.first_token + self.delay * len(tokens))
+            self._json({
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                             "finish_reason": "stop"}],
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def event(delta: Dict, finish=None) -> None:
+            chunk = {"object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(self.first_token)
+        event({"role": "assistant"})
+        for i, tok in enumerate(tokens):
+            if i:
+                time.sleep(self.delay)
+            event({"content": tok})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, fmt: str, *args) -> None:
+        pass
+
+
+def serve(port: int = 1234, first_token: float = 0.5, delay: float = 0.05) -> ThreadingHTTPServer:
+    """Start the server (call .serve_forever() / .shutdown() on the result)."""
+    Handler.first_token = first_token
+    Handler.delay = delay
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Fake LM Studio server (OpenAI-compatible, SSE streaming).")
+    ap.add_argument("--port", type=int, default=1234)
+    ap.add_argument("--first-token", type=float, default=0.5, help="seconds before the first token")
+    ap.add_argument("--delay", type=float, default=0.05, help="seconds between tokens")
+    args = ap.parse_args()
+    server = serve(args.port, args.first_token, args.delay)
+    print(f"fake LM Studio on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,19 @@ This file contains the "core logic" of the chatbot:
 - embed a user query
 - retrieve the most relevant chunks
 - call LM Studio (OpenAI-like REST API) to generate the final answer
+
+The embedding model and the Chroma collection are loaded once per process
+and reused by every question (see get_embedder / get_collection).
+Answers can go through a semantic cache (answer_cache.AnswerCache).
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+import json
+import time
 import requests
 
 import chromadb
@@ -33,15 +40,53 @@ class Settings:
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
 
 
+@lru_cache(maxsize=None)
+def _load_collection(chroma_dir: str, collection_name: str):
+    client = chromadb.PersistentClient(path=chroma_dir)
+    return client.get_or_create_collection(name=collection_name)
+
+
+@lru_cache(maxsize=None)
+def _load_embedder(embedding_model: str) -> SentenceTransformer:
+    return SentenceTransformer(embedding_model)
+
+
 def get_collection(s: Settings):
-    """Load the ChromaDB collection that stores Othello chunks."""
-    client = chromadb.PersistentClient(path=s.chroma_dir)
-    return client.get_or_create_collection(name=s.collection_name)
+    """
+    Load the ChromaDB collection that stores Othello chunks.
+
+    Cached per process: one client per (chroma_dir, collection_name).
+    """
+    return _load_collection(s.chroma_dir, s.collection_name)
 
 
 def get_embedder(s: Settings) -> SentenceTransformer:
-    """Load the embedding model (used both at build time and query time)."""
-    return SentenceTransformer(s.embedding_model)
+    """
+    Load the embedding model (used both at build time and query time).
+
+    Cached per process: the weights are read from disk once per model name.
+    """
+    return _load_embedder(s.embedding_model)
+
+
+def warm_up(s: Settings) -> Dict[str, float]:
+    """
+    Load the embedder + collection and run one encode before the first question.
+
+    Returns the seconds spent in each step.
+    """
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    embedder = get_embedder(s)
+    t1 = time.perf_counter()
+    get_collection(s)
+    t2 = time.perf_counter()
+    embed_text(embedder, "warm up")
+    t3 = time.perf_counter()
+    timings["load_embedder"] = t1 - t0
+    timings["load_collection"] = t2 - t1
+    timings["first_encode"] = t3 - t2
+    return timings
 
 
 def embed_text(embedder: SentenceTransformer, text: str) -> List[float]:
@@ -95,20 +140,54 @@ def lmstudio_chat(s: Settings, messages: List[Dict]) -> str:
     return data["choices"][0]["message"]["content"]
 
 
-def answer_with_rag(s: Settings, question: str, history: List[Dict]) -> Tuple[str, List[str]]:
+def lmstudio_chat_stream(s: Settings, messages: List[Dict]) -> Iterator[str]:
     """
-    End-to-end RAG:
-    1) embed question
-    2) retrieve top-k chunks
-    3) send augmented prompt to the LLM
-    4) return answer + citations list
+    Same call as lmstudio_chat with "stream": true.
+
+    LM Studio answers with Server-Sent Events ("data: {json}" lines, then
+    "data: [DONE]"); the content deltas are yielded as they arrive.
     """
-    col = get_collection(s)
-    embedder = get_embedder(s)
+    url = f"{s.lm_base_url.rstrip('/')}/v1/chat/completions"
+    payload = {
+        "model": s.model_id,
+        "messages": messages,
+        "temperature": s.temperature,
+        "max_tokens": 400,
+        "stream": True,
+    }
+    with requests.post(url, json=payload, timeout=120, stream=True) as r:
+        r.raise_for_status()
+        # text/event-stream has no charset, requests would fall back to latin-1
+        r.encoding = "utf-8"
+        for line in r.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+def build_messages(
+    s: Settings, question: str, history: List[Dict], q_emb: Optional[List[float]] = None
+) -> Tuple[List[Dict], List[str], Dict[str, float]]:
+    """
+    Steps 1) and 2) of the RAG: embed + retrieve, then the prompt.
 
-    q_emb = embed_text(embedder, question)
+    q_emb skips the embedding when the caller already has it.
+    Returns (messages for the LLM, citations, timings of embed / retrieve).
+    """
+    t0 = time.perf_counter()
+    col = get_collection(s)
+    if q_emb is None:
+        q_emb = embed_text(get_embedder(s), question)
+    t1 = time.perf_counter()
     chunks = retrieve(col, q_emb, s.top_k)
     context, citations = format_context(chunks)
+    t2 = time.perf_counter()
 
     system = {
         "role": "system",
@@ -124,4 +203,92 @@ def answer_with_rag(s: Settings, question: str, history: List[Dict]) -> Tuple[st
         "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer with citations.",
     }
     messages = [system] + history + [user]
-    return lmstudio_chat(s, messages), citations
+    return messages, citations, {"embed": t1 - t0, "retrieve": t2 - t1}
+
+
+def _cache_lookup(s: Settings, question: str, history: List[Dict], cache, timings: Dict[str, float], t0: float):
+    """
+    Embed the question and look it up in the cache.
+
+    Returns (q_emb, (answer, citations) or None); on a hit timings is complete.
+    """
+    if cache is None:
+        return None, None
+    q_emb = embed_text(get_embedder(s), question)
+    hit = cache.get(s, question, history, q_emb)
+    if hit is not None:
+        t1 = time.perf_counter()
+        timings.update({"embed": t1 - t0, "retrieve": 0.0, "llm": 0.0, "total": t1 - t0, "cache_hit": 1.0})
+    return q_emb, hit
+
+
+def answer_with_rag(
+    s: Settings, question: str, history: List[Dict], timings: Optional[Dict[str, float]] = None, cache=None
+) -> Tuple[str, List[str]]:
+    """
+    End-to-end RAG:
+    1) embed question
+    2) retrieve top-k chunks
+    3) send augmented prompt to the LLM
+    4) return answer + citations list
+
+    If a timings dict is given, the seconds spent in each step are stored in it.
+    With an AnswerCache, a close enough cached question skips 2) and 3).
+    """
+    timings = {} if timings is None else timings
+    t0 = time.perf_counter()
+    q_emb, hit = _cache_lookup(s, question, history, cache, timings, t0)
+    if hit is not None:
+        return hit
+    t_lookup = time.perf_counter() - t0
+    messages, citations, steps = build_messages(s, question, history, q_emb)
+    steps["embed"] += t_lookup
+    t1 = time.perf_counter()
+    answer = lmstudio_chat(s, messages)
+    t2 = time.perf_counter()
+    timings.update(steps)
+    timings["llm"] = t2 - t1
+    timings["total"] = t2 - t0
+    if cache is not None:
+        cache.put(s, question, history, q_emb, answer, citations, timings["total"])
+    return answer, citations
+
+
+def answer_with_rag_stream(
+    s: Settings, question: str, history: List[Dict], timings: Optional[Dict[str, float]] = None, cache=None
+) -> Tuple[Iterator[str], List[str]]:
+    """
+    Streaming version of answer_with_rag.
+
+    Returns as soon as retrieval is done: (token iterator, citations), so the
+    sources can be shown while the answer is still being generated. The
+    request to LM Studio starts when the iterator is first consumed; timings
+    gets "first_token" (time to first token) and "llm" / "total" at the end.
+    A cache hit is returned as a one-chunk iterator; a fully consumed stream
+    is added to the cache.
+    """
+    timings = {} if timings is None else timings
+    t0 = time.perf_counter()
+    q_emb, hit = _cache_lookup(s, question, history, cache, timings, t0)
+    if hit is not None:
+        return iter([hit[0]]), hit[1]
+    t_lookup = time.perf_counter() - t0
+    messages, citations, steps = build_messages(s, question, history, q_emb)
+    steps["embed"] += t_lookup
+    timings.update(steps)
+
+    def tokens() -> Iterator[str]:
+        t1 = time.perf_counter()
+        parts: List[str] = []
+        for delta in lmstudio_chat_stream(s, messages):
+            if "first_token" not in timings:
+                timings["first_token"] = time.perf_counter() - t0
+            parts.append(delta)
+            yield delta
+        t2 = time.perf_counter()
+        timings["llm"] = t2 - t1
+        timings["total"] = t2 - t0
+        if cache is not None:
+            cache.put(s, question, history, q_emb, "".join(parts), citations, timings["total"])
+
+    return tokens(), citations
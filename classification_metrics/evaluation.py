@@ -0,0 +1,213 @@
+"""
+evaluation.py
+
+k-fold cross-validation and bootstrap confidence intervals for NB.
+
+- the corpus is tokenized once into a (docs x words) count matrix; the
+  workers receive it once (pool initializer) and every fold just slices
+  rows, nothing is re-cleaned
+- a fold model is built straight from the counts of its train rows
+  (NB.from_state), same model as NB().train on those texts
+- folds run in parallel worker processes
+- bootstrap resamples are drawn over the confusion matrix cells
+  (multinomial), vectorized, instead of re-predicting anything
+
+    python evaluation.py "C:\\information_retrieval\\classification dataset - ground_truth.csv" --folds 5 --boot 1000
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from metrics import ConfusionAccumulator
+from naive_bayes import NB
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+from tokenizer import TokenCorpus
+
+
+def tokenize_corpus(texts, labels):
+    """Count matrix over the whole corpus + integer labels."""
+    X = TokenCorpus.from_texts(texts).counts()
+    classes = list(dict.fromkeys(labels))
+    c2i = {c: i for i, c in enumerate(classes)}
+    y = np.fromiter((c2i[l] for l in labels), dtype=np.int64, count=len(labels))
+    return X, y, classes
+
+
+def kfold_indices(n, k, shuffle=True, seed=0):
+    idx = np.arange(n)
+    if shuffle:
+        np.random.default_rng(seed).shuffle(idx)
+    return [np.sort(part) for part in np.array_split(idx, k)]
+
+
+# corpus shared by every fold of a worker process
+_X = None
+_Y = None
+
+
+def _init_worker(X, y):
+    global _X, _Y
+    _X, _Y = X, y
+
+
+def _run_fold(args):
+    train, test, alpha = args
+    return test, fit_predict(_X, _Y, train, test, alpha)
+
+
+def fit_predict(X, y, train, test, alpha=1.0):
+    """Train on rows `train` of the count matrix, predict rows `test` (label codes)."""
+    Xtr, ytr = X[train], y[train]
+
+    # classes in order of first appearance, as NB.train would see them
+    codes, first = np.unique(ytr, return_index=True)
+    codes = codes[np.argsort(first, kind='stable')]
+    cmap = np.full(y.max() + 1, -1, dtype=np.int64)
+    cmap[codes] = np.arange(len(codes))
+
+    # only the words seen in the train rows are in the vocabulary
+    cols = np.flatnonzero(np.asarray(Xtr.sum(axis=0)).ravel() > 0)
+    Y = sparse.csr_matrix((np.ones(len(ytr), dtype=np.int64), (np.arange(len(ytr)), cmap[ytr])),
+                          shape=(len(ytr), len(codes)))
+    state = {
+        'alpha': alpha,
+        'classes': codes.tolist(),
+        'vocab': cols.tolist(),
+        'n_docs': len(ytr),
+        'class_counts': np.bincount(cmap[ytr], minlength=len(codes)),
+        'word_counts': (Y.T @ Xtr[:, cols]).toarray(),
+    }
+    model = NB.from_state(state)
+
+    Xte = X[test]
+    known = Xte[:, cols]
+    n_unk = np.asarray(Xte.sum(axis=1)).ravel() - np.asarray(known.sum(axis=1)).ravel()
+    best = np.argmax(model.scores(known, n_unk), axis=1)
+    return codes[best]
+
+
+def cross_validate(texts, labels, k=5, n_jobs=None, shuffle=True, seed=0, alpha=1.0):
+    """
+    Out-of-fold predictions + per-fold accuracy / macro F1.
+
+    Returns (pred, folds) with pred aligned to `labels` and folds a DataFrame.
+    """
+    labels = list(labels)
+    X, y, classes = tokenize_corpus(texts, labels)
+    folds = kfold_indices(len(y), k, shuffle, seed)
+    jobs = [(np.concatenate(folds[:i] + folds[i + 1:]), folds[i], alpha) for i in range(k)]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        _init_worker(X, y)
+        results = list(map(_run_fold, jobs))
+    else:
+        with ProcessPoolExecutor(min(n_jobs, k), initializer=_init_worker, initargs=(X, y)) as ex:
+            results = list(ex.map(_run_fold, jobs))
+
+    pred = np.empty(len(y), dtype=np.int64)
+    rows = []
+    for i, (test, p) in enumerate(results):
+        pred[test] = p
+        acc = ConfusionAccumulator().update(y[test], p)
+        rows.append({'fold': i, 'n': len(test), 'accuracy': acc.accuracy(),
+                     'macro_f1': acc.averages().loc['macro', 'F1']})
+    return [classes[i] for i in pred], pd.DataFrame(rows)
+
+
+def bootstrap_ci(y_true, y_pred, n_boot=1000, ci=0.95, seed=0, batch=200):
+    """
+    Bootstrap CI of accuracy and macro precision / recall / F1.
+
+    Resampling n pairs with replacement = one multinomial draw over the
+    nonzero cells of the confusion matrix, so a whole batch of resamples
+    is one (batch x cells) array and per-class counts are matmuls.
+    """
+    acc = ConfusionAccumulator().update(y_true, y_pred)
+    # cells of the full matrix: predictions of labels absent from y_true
+    # still count in n and as errors, only the true classes get P/R/F1
+    cm = acc.cm
+    n_labels = cm.shape[0]
+    true_classes = np.flatnonzero(cm.sum(axis=1) > 0)
+    rows, cols = np.nonzero(cm)
+    counts = cm[rows, cols]
+    n = len(y_true)
+
+    # cell -> label indicator matrices
+    cells = np.arange(len(rows))
+    ones = np.ones(len(rows))
+    true_of = sparse.csr_matrix((ones, (cells, rows)), shape=(len(rows), n_labels))[:, true_classes]
+    pred_of = sparse.csr_matrix((ones, (cells, cols)), shape=(len(rows), n_labels))[:, true_classes]
+    diag = rows == cols
+    tp_of = sparse.csr_matrix((ones[diag], (cells[diag], rows[diag])), shape=(len(rows), n_labels))[:, true_classes]
+
+    def scores(draws):
+        tp = (tp_of.T @ draws.T).T
+        support = (true_of.T @ draws.T).T
+        predicted = (pred_of.T @ draws.T).T
+        p = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+        r = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+        f1 = np.divide(2 * (p * r), p + r, out=np.zeros_like(tp), where=(p + r) > 0)
+
+        # classes missing from a resample are left out of its macro average
+        present = support > 0
+        n_present = np.maximum(present.sum(axis=1), 1)
+        return {
+            'accuracy': tp.sum(axis=1) / n,
+            'macro_prec': (p * present).sum(axis=1) / n_present,
+            'macro_rec': (r * present).sum(axis=1) / n_present,
+            'macro_f1': (f1 * present).sum(axis=1) / n_present,
+        }
+
+    rng = np.random.default_rng(seed)
+    out = {'accuracy': [], 'macro_prec': [], 'macro_rec': [], 'macro_f1': []}
+    for start in range(0, n_boot, batch):
+        draws = rng.multinomial(n, counts / n, size=min(batch, n_boot - start)).astype(float)
+        for name, values in scores(draws).items():
+            out[name].append(values)
+
+    # point estimate from the same counts, so it is scored like a resample
+    point = {name: values[0] for name, values in scores(counts[None, :].astype(float)).items()}
+    lo_q, hi_q = (1 - ci) / 2 * 100, (1 + ci) / 2 * 100
+    res = []
+    for name, parts in out.items():
+        samples = np.concatenate(parts)
+        lo, hi = np.percentile(samples, [lo_q, hi_q])
+        res.append({'metric': name, 'point': point[name], 'low': lo, 'high': hi})
+    return pd.DataFrame(res)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('csv', help='ground truth csv, no header: text, label')
+    ap.add_argument('--folds', type=int, default=5)
+    ap.add_argument('--boot', type=int, default=1000)
+    ap.add_argument('--jobs', type=int, default=None)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--out', help='csv for the bootstrap table')
+    args = ap.parse_args()
+
+    df = pd.read_csv(args.csv, header=None, usecols=[0, 1])
+    df.columns = ['text', 'label']
+    print(f"{len(df)} rows, {args.folds} folds")
+
+    pred, folds = cross_validate(df['text'].tolist(), df['label'].tolist(), k=args.folds,
+                                 n_jobs=args.jobs, seed=args.seed)
+    print(folds)
+    print(f"accuracy {folds['accuracy'].mean():.4f} +/- {folds['accuracy'].std():.4f}")
+
+    boot = bootstrap_ci(df['label'].tolist(), pred, n_boot=args.boot, seed=args.seed)
+    print(boot)
+    if args.out:
+        boot.to_csv(args.out, index=False)
+
+
+if __name__ == '__main__':
+    main()
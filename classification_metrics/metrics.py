@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+
+# dict key shared by every missing label
+_MISSING = object()
+
+
+class ConfusionAccumulator:
+    """
+    Confusion matrix built with np.bincount, updatable batch by batch.
+
+    Labels are encoded to integers in order of first appearance; rows are
+    true labels, columns predicted labels. Per-class numbers follow the
+    original get_stats: classes are the true labels (sorted) and FP / FN
+    only count those classes.
+    """
+
+    def __init__(self):
+        self.labels = []
+        self.l2i = {}
+        self.cm = np.zeros((0, 0), dtype=np.int64)
+
+    def _encode(self, values):
+        values = pd.Series(values, dtype=object)
+        for v in pd.unique(values):
+            # every NaN / None is one label (two NaN objects are different dict keys)
+            key = _MISSING if pd.isna(v) else v
+            if key not in self.l2i:
+                self.l2i[key] = len(self.labels)
+                self.labels.append(np.nan if key is _MISSING else v)
+        return pd.Index(self.labels, dtype=object).get_indexer(values.where(values.notna(), np.nan))
+
+    def update(self, y_true, y_pred):
+        """Add one batch of (true, predicted) labels."""
+        t = self._encode(y_true)
+        p = self._encode(y_pred)
+        if len(t) != len(p):
+            raise ValueError(f"y_true and y_pred differ in length ({len(t)} != {len(p)})")
+        n = len(self.labels)
+        if self.cm.shape[0] < n:
+            cm = np.zeros((n, n), dtype=np.int64)
+            cm[:self.cm.shape[0], :self.cm.shape[1]] = self.cm
+            self.cm = cm
+        self.cm += np.bincount(t * n + p, minlength=n * n).reshape(n, n)
+        return self
+
+    def merge(self, other):
+        """Add the counts of another accumulator."""
+        idx = self._encode(other.labels)
+        n = len(self.labels)
+        if self.cm.shape[0] < n:
+            cm = np.zeros((n, n), dtype=np.int64)
+            cm[:self.cm.shape[0], :self.cm.shape[1]] = self.cm
+            self.cm = cm
+        self.cm[np.ix_(idx, idx)] += other.cm
+        return self
+
+    def class_matrix(self):
+        """(sorted true classes, confusion matrix restricted to them)."""
+        seen = np.flatnonzero(self.cm.sum(axis=1) > 0)
+        # a missing (NaN) label sorts last
+        order = sorted(seen, key=lambda i: (pd.isna(self.labels[i]), '' if pd.isna(self.labels[i]) else self.labels[i]))
+        return [self.labels[i] for i in order], self.cm[np.ix_(order, order)]
+
+    def accuracy(self):
+        total = self.cm.sum()
+        return np.trace(self.cm) / total if total else 0.0
+
+    def per_class(self):
+        """DataFrame Class / Prec / Rec / F1 / Support."""
+        classes, cm = self.class_matrix()
+        tp = np.diag(cm).astype(float)
+        fp = cm.sum(axis=0) - tp
+        fn = cm.sum(axis=1) - tp
+        p = _safe_div(tp, tp + fp)
+        r = _safe_div(tp, tp + fn)
+        f1 = _safe_div(2 * (p * r), p + r)
+        return pd.DataFrame({'Class': classes, 'Prec': p, 'Rec': r, 'F1': f1, 'Support': tp + fn})
+
+    def averages(self):
+        """Macro / micro / weighted precision, recall and F1."""
+        stats = self.per_class()
+        classes, cm = self.class_matrix()
+        tp = np.trace(cm)
+        micro_p = _safe_div(tp, cm.sum(axis=0).sum())
+        micro_r = _safe_div(tp, cm.sum(axis=1).sum())
+        w = stats['Support'].to_numpy()
+        w = w / w.sum() if w.sum() else w
+        rows = {
+            'macro': stats[['Prec', 'Rec', 'F1']].mean().to_numpy(),
+            'micro': [micro_p, micro_r, _safe_div(2 * micro_p * micro_r, micro_p + micro_r)],
+            'weighted': (stats[['Prec', 'Rec', 'F1']].to_numpy() * w[:, None]).sum(axis=0),
+        }
+        return pd.DataFrame(rows, index=['Prec', 'Rec', 'F1']).T
+
+
+def _safe_div(a, b):
+    # 0 where the denominator is 0 (same convention as get_stats)
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    out = np.divide(a, b, out=np.zeros(np.broadcast(a, b).shape), where=b > 0)
+    return out if out.ndim else float(out)
+
+
+# calc stats (vectorized)
+def get_stats(y_true, y_pred):
+    acc = ConfusionAccumulator().update(y_true, y_pred)
+    stats = acc.per_class()
+    return acc.accuracy(), stats[['Class', 'Prec', 'Rec', 'F1']]
@@ -0,0 +1,270 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+from tokenizer import tokenize, tokenize_many
+
+
+# clean text (shared, cached tokenizer)
+clean = tokenize
+
+
+def _grow(arr, rows, cols):
+    # capacity doubling on both axes so repeated partial_fit stays cheap
+    r, c = arr.shape
+    if rows <= r and cols <= c:
+        return arr
+    new_r = r if rows <= r else max(rows, 2 * r)
+    new_c = c if cols <= c else max(cols, 2 * c)
+    out = np.zeros((new_r, new_c), dtype=arr.dtype)
+    out[:r, :c] = arr
+    return out
+
+
+class NB:
+    """
+    Multinomial Naive Bayes on a sparse document-term count matrix.
+
+    Same model as the original dict version (Laplace smoothing, one shared
+    '__unk__' probability per class for unseen words), but:
+    - log P(w|c) is one dense (classes x vocab) array
+    - predict_many scores all texts with one sparse matmul + argmax
+    - partial_fit only adds to class / word counts, so the data can be
+      streamed in chunks; log-probabilities are finalized lazily at
+      predict time and one pass == many passes, bit for bit
+    - the counts (get_state) can be pickled and merged, so shards can be
+      counted in parallel processes and reduced in order
+    """
+
+    def __init__(self, alpha=1.0):
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.classes = []
+        self.c2i = {}
+        self.vocab = []
+        self.w2i = {}
+        self.n_docs = 0
+        self._class_counts = np.zeros(0, dtype=np.int64)
+        self._wc = np.zeros((0, 0), dtype=np.int64)
+        self._dirty = True
+
+    @property
+    def class_counts(self):
+        return self._class_counts[:len(self.classes)]
+
+    @property
+    def word_counts(self):
+        """(classes x vocab) token counts."""
+        return self._wc[:len(self.classes), :len(self.vocab)]
+
+    def count_matrix(self, token_lists, grow=False):
+        """
+        (docs x vocab) CSR of token counts + number of unknown tokens per doc.
+
+        With grow=True new words are added to the vocabulary.
+        """
+        indptr = [0]
+        indices = []
+        n_unk = np.zeros(len(token_lists), dtype=np.int64)
+        w2i = self.w2i
+        for d, toks in enumerate(token_lists):
+            for w in toks:
+                i = w2i.get(w)
+                if i is None:
+                    if not grow:
+                        n_unk[d] += 1
+                        continue
+                    i = w2i[w] = len(self.vocab)
+                    self.vocab.append(w)
+                indices.append(i)
+            indptr.append(len(indices))
+        # duplicate (doc, word) entries are summed by the conversion
+        X = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int64), np.asarray(indices, dtype=np.int64),
+             np.asarray(indptr, dtype=np.int64)),
+            shape=(len(token_lists), len(self.vocab)),
+        )
+        X.sum_duplicates()
+        return X, n_unk
+
+    def partial_fit(self, texts, labels):
+        """Add one chunk of (text, label) to the counts."""
+        return self.partial_fit_tokens(tokenize_many(texts), labels)
+
+    def partial_fit_tokens(self, token_lists, labels):
+        """partial_fit for already tokenized texts (e.g. TokenCorpus.token_lists())."""
+        token_lists, labels = list(token_lists), list(labels)
+        n = len(labels)
+        if len(token_lists) != n:
+            raise ValueError(f"texts and labels differ in length ({len(token_lists)} != {n})")
+        for l in labels:
+            if l not in self.c2i:
+                self.c2i[l] = len(self.classes)
+                self.classes.append(l)
+        y = np.fromiter((self.c2i[l] for l in labels), dtype=np.int64, count=n)
+        X, _ = self.count_matrix(token_lists, grow=True)
+
+        n_classes, n_words = len(self.classes), len(self.vocab)
+        self._class_counts = _grow(self._class_counts[None, :], 1, n_classes)[0]
+        self._class_counts[:n_classes] += np.bincount(y, minlength=n_classes)
+
+        # word counts per class = one-hot(labels).T @ counts, only nonzeros are added
+        Y = sparse.csr_matrix((np.ones(n, dtype=np.int64), (np.arange(n), y)), shape=(n, n_classes))
+        wc = (Y.T @ X).tocoo()
+        self._wc = _grow(self._wc, n_classes, n_words)
+        self._wc[wc.row, wc.col] += wc.data
+
+        self.n_docs += n
+        self._dirty = True
+        return self
+
+    def get_state(self):
+        """Sufficient statistics as a plain (picklable) dict."""
+        return {
+            'alpha': self.alpha,
+            'classes': list(self.classes),
+            'vocab': list(self.vocab),
+            'n_docs': self.n_docs,
+            'class_counts': self.class_counts.copy(),
+            'word_counts': self.word_counts.copy(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        model = cls(alpha=state['alpha'])
+        model.merge(state)
+        return model
+
+    def merge(self, state):
+        """
+        Add the counts of another model (or its get_state()) to this one.
+
+        Unknown classes / words are appended in the other model's order, so
+        merging shards in input order gives exactly the single-pass model.
+        """
+        if isinstance(state, NB):
+            state = state.get_state()
+        cmap = np.empty(len(state['classes']), dtype=np.int64)
+        for j, c in enumerate(state['classes']):
+            if c not in self.c2i:
+                self.c2i[c] = len(self.classes)
+                self.classes.append(c)
+            cmap[j] = self.c2i[c]
+        wmap = np.empty(len(state['vocab']), dtype=np.int64)
+        for j, w in enumerate(state['vocab']):
+            i = self.w2i.get(w)
+            if i is None:
+                i = self.w2i[w] = len(self.vocab)
+                self.vocab.append(w)
+            wmap[j] = i
+
+        n_classes, n_words = len(self.classes), len(self.vocab)
+        self._class_counts = _grow(self._class_counts[None, :], 1, n_classes)[0]
+        self._class_counts[cmap] += state['class_counts']
+        self._wc = _grow(self._wc, n_classes, n_words)
+        self._wc[np.ix_(cmap, wmap)] += state['word_counts']
+        self.n_docs += state['n_docs']
+        self._dirty = True
+        return self
+
+    def fit_csv(self, path, chunksize=100_000, text_col=0, label_col=1, n_jobs=1, **read_csv_kw):
+        """
+        Stream a csv through partial_fit, chunksize rows at a time.
+
+        With n_jobs > 1 the chunks are counted in worker processes (at most
+        2 * n_jobs in flight) and merged back in file order.
+        """
+        import pandas as pd
+
+        read_csv_kw.setdefault('header', None)
+        chunks = pd.read_csv(path, usecols=[text_col, label_col], chunksize=chunksize, **read_csv_kw)
+        shards = ((c[text_col].tolist(), c[label_col].tolist()) for c in chunks)
+        if n_jobs == 1:
+            for texts, labels in shards:
+                self.partial_fit(texts, labels)
+            return self
+        for state in _count_shards(shards, self.alpha, n_jobs):
+            self.merge(state)
+        return self
+
+    def train(self, texts, labels):
+        print("training...")
+        self.reset()
+        self.partial_fit(texts, labels)
+        self._finalize()
+
+    def _finalize(self):
+        # log-probabilities from the current counts
+        if not self._dirty:
+            return
+        wc = self.word_counts
+
+        # priors
+        self.priors = np.log(self.class_counts / self.n_docs)
+
+        # cond probs (+ unknown word handling)
+        v_len = len(self.vocab)
+        denom = wc.sum(axis=1) + self.alpha * v_len
+        self.log_probs = np.log((wc + self.alpha) / denom[:, None])
+        self.unk = np.log(self.alpha / denom)
+        self._dirty = False
+
+    def scores(self, X, n_unk):
+        """Log posterior (up to a constant) of every class, docs x classes."""
+        self._finalize()
+        return np.asarray(X @ self.log_probs.T) + n_unk[:, None] * self.unk[None, :] + self.priors[None, :]
+
+    def predict_many(self, texts):
+        return self.predict_tokens(tokenize_many(texts))
+
+    def predict_tokens(self, token_lists):
+        X, n_unk = self.count_matrix(token_lists)
+        best = np.argmax(self.scores(X, n_unk), axis=1)
+        return [self.classes[i] for i in best]
+
+    def predict(self, text):
+        return self.predict_many([text])[0]
+
+
+def _count_shard(args):
+    texts, labels, alpha = args
+    return NB(alpha=alpha).partial_fit(texts, labels).get_state()
+
+
+def _count_shards(shards, alpha, n_jobs=None):
+    # states come back in shard order, at most 2 * n_jobs shards in flight
+    n_jobs = n_jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(n_jobs) as ex:
+        pending = []
+        for texts, labels in shards:
+            pending.append(ex.submit(_count_shard, (texts, labels, alpha)))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.pop(0).result()
+        for fut in pending:
+            yield fut.result()
+
+
+def train_parallel(texts, labels, n_jobs=None, n_shards=None, alpha=1.0):
+    """
+    Train an NB by counting contiguous shards in parallel processes.
+
+    The result is bit-identical to NB().train(texts, labels).
+    """
+    print("training...")
+    texts, labels = list(texts), list(labels)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n_shards = n_shards or 4 * n_jobs
+    step = max(1, -(-len(texts) // n_shards))
+    shards = ((texts[i:i + step], labels[i:i + step]) for i in range(0, len(texts), step))
+
+    model = NB(alpha=alpha)
+    for state in _count_shards(shards, alpha, n_jobs):
+        model.merge(state)
+    model._finalize()
+    return model
@@ -0,0 +1,164 @@
+"""
+tokenizer.py
+
+The one tokenizer shared by tf_idf, classification_metrics and levenshtein:
+lowercase, then \\w+ runs (the assignment tokenizer).
+
+- tokenize      : one text, precompiled pattern + LRU cache for repeated strings
+- tokenize_many : a whole column, each distinct string tokenized once
+- TokenCorpus   : a tokenized column as flat int32 token ids + offsets, saved
+                  as .npy files and reopened memory-mapped, so every tool can
+                  reuse one pre-tokenized corpus instead of re-tokenizing
+
+Scripts in the other folders import it with
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+    from tokenizer import tokenize
+
+    python tokenizer.py <csv> <out_dir> [column]    # pre-tokenize a csv column
+"""
+
+import os
+import re
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+
+TOKEN_RE = re.compile(r'\w+')
+_findall = TOKEN_RE.findall
+
+
+@lru_cache(maxsize=2**16)
+def _tokenize(text):
+    return tuple(_findall(text.lower()))
+
+
+def tokenize(text):
+    """Tokens of one text, as a tuple (cached: do not rely on identity)."""
+    return _tokenize(text if isinstance(text, str) else str(text))
+
+
+def tokenize_many(texts):
+    """
+    Token lists for a whole column.
+
+    Duplicate strings are tokenized once and share the same list, so the
+    lists must not be modified in place.
+    """
+    memo = {}
+    out = []
+    for t in texts:
+        if not isinstance(t, str):
+            t = str(t)
+        toks = memo.get(t)
+        if toks is None:
+            toks = memo[t] = _findall(t.lower())
+        out.append(toks)
+    return out
+
+
+def _as_symbol(ids):
+    # id -> one code point, skipping 0 (padding in lev_batch) and the surrogates
+    ids = np.asarray(ids, dtype=np.int64) + 1
+    return ids + (ids >= 0xD800) * 0x800
+
+
+class TokenCorpus:
+    """
+    Tokenized documents in CSR layout: doc i is ids[offsets[i]:offsets[i + 1]],
+    token id j is vocab[j] (ids in order of first appearance).
+    """
+
+    def __init__(self, vocab, ids, offsets):
+        self.vocab = vocab
+        self.ids = ids
+        self.offsets = offsets
+
+    @classmethod
+    def from_texts(cls, texts, vocab=None):
+        """Tokenize texts; an existing vocab (list) is extended, not replaced."""
+        vocab = [] if vocab is None else vocab
+        w2i = {w: i for i, w in enumerate(vocab)}
+        ids = []
+        offsets = [0]
+        for toks in tokenize_many(texts):
+            for w in toks:
+                i = w2i.get(w)
+                if i is None:
+                    i = w2i[w] = len(vocab)
+                    vocab.append(w)
+                ids.append(i)
+            offsets.append(len(ids))
+        return cls(vocab, np.asarray(ids, dtype=np.int32), np.asarray(offsets, dtype=np.int64))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """Token ids of doc i."""
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def tokens(self, i):
+        """Token strings of doc i."""
+        return [self.vocab[j] for j in self[i].tolist()]
+
+    def token_lists(self):
+        """Token strings of every doc (what NB / TfidfIndex take pre-tokenized)."""
+        vocab = self.vocab
+        ids = self.ids.tolist()
+        off = self.offsets.tolist()
+        return [[vocab[j] for j in ids[off[d]:off[d + 1]]] for d in range(len(self))]
+
+    def counts(self):
+        """(docs x vocab) CSR of token counts."""
+        from scipy import sparse
+
+        X = sparse.csr_matrix(
+            (np.ones(len(self.ids), dtype=np.int64), np.asarray(self.ids), np.asarray(self.offsets)),
+            shape=(len(self), len(self.vocab)),
+        )
+        X.sum_duplicates()
+        return X
+
+    def symbols(self, i):
+        """
+        Doc i as a str with one character per token, so the Levenshtein
+        kernels (lev, fast_lev.distance, lev_batch) give word-level edit
+        distances.
+        """
+        return ''.join(map(chr, _as_symbol(self[i]).tolist()))
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'token_ids.npy'), np.asarray(self.ids))
+        np.save(os.path.join(path, 'token_offsets.npy'), np.asarray(self.offsets))
+        with open(os.path.join(path, 'token_vocab.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.vocab))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        ids = np.load(os.path.join(path, 'token_ids.npy'), mmap_mode=mmap_mode)
+        offsets = np.load(os.path.join(path, 'token_offsets.npy'), mmap_mode=mmap_mode)
+        with open(os.path.join(path, 'token_vocab.txt'), encoding='utf-8') as f:
+            text = f.read()
+        return cls(text.split('\n') if text else [], ids, offsets)
+
+
+def main(argv):
+    if len(argv) not in (3, 4):
+        print('usage: python tokenizer.py <csv> <out_dir> [column]')
+        return 1
+    import pandas as pd
+
+    df = pd.read_csv(argv[1])
+    col = df[argv[3]] if len(argv) == 4 else df.iloc[:, 0]
+    corpus = TokenCorpus.from_texts(col.astype(str))
+    corpus.save(argv[2])
+    print(f"saved {len(corpus)} docs, {len(corpus.ids)} tokens, {len(corpus.vocab)} words to {argv[2]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,191 @@
+"""
+bench_lev.py
+
+Benchmark suite for every Levenshtein implementation in this folder.
+
+- time.perf_counter, warmup call(s), then `repeats` timed rounds
+- each round runs the kernel enough times to last >= min_time (like timeit)
+- median and IQR per (kernel, input kind, size)
+- two input kinds: 'random' (unrelated strings) and 'near' (a few edits
+  apart, where cutoffs / prefix stripping matter)
+- results go to JSON so two runs can be diffed with --compare
+
+    python bench_lev.py --out bench_lev.json --plot bench_lev.png
+    python bench_lev.py --out new.json --compare bench_lev.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import string
+import sys
+import time
+
+import numpy as np
+
+from fast_lev import banded, distance, myers
+from lev_batch import lev_batch
+from levenshtein import lev
+
+
+KERNELS = {
+    'lev': lev,
+    'myers': myers,
+    'distance': distance,
+    'distance_k10': lambda s, t: distance(s, t, 10),
+    'banded_k10': lambda s, t: banded(s, t, 10),
+    # one pair through the NumPy anti-diagonal DP
+    'lev_batch': lambda s, t: lev_batch([s], [t], long_len=10**9)[0],
+}
+
+
+def make_pair(size, kind, seed=0):
+    rng = random.Random(f"{seed}-{size}-{kind}")
+    s = ''.join(rng.choices(string.ascii_lowercase, k=size))
+    if kind == 'random':
+        return s, ''.join(rng.choices(string.ascii_lowercase, k=size))
+    t = list(s)
+    for _ in range(5):
+        t[rng.randrange(size)] = rng.choice(string.ascii_lowercase)
+    return s, ''.join(t)
+
+
+def measure(fn, s, t, repeats=7, warmup=1, min_time=0.05):
+    """Seconds per call for each of `repeats` rounds."""
+    t0 = time.perf_counter()
+    for _ in range(warmup):
+        fn(s, t)
+    first = (time.perf_counter() - t0) / max(warmup, 1)
+
+    # calls per round so that a round lasts at least min_time
+    number = max(1, int(min_time / first)) if first > 0 else 1000
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn(s, t)
+        times.append((time.perf_counter() - t0) / number)
+    return number, times
+
+
+def summarize(times):
+    q1, med, q3 = np.percentile(times, [25, 50, 75])
+    return {'median': float(med), 'q1': float(q1), 'q3': float(q3), 'iqr': float(q3 - q1)}
+
+
+def run_suite(kernels=None, sizes=(100, 500, 1000, 2000), kinds=('random', 'near'),
+              repeats=7, warmup=1, min_time=0.05, max_call=5.0, verbose=True):
+    """
+    Time every kernel on every (kind, size).
+
+    A kernel whose single call takes more than max_call seconds skips the
+    larger sizes (e.g. pure-python lev past a few thousand characters).
+    """
+    kernels = kernels or KERNELS
+    results = []
+    for name, fn in kernels.items():
+        for kind in kinds:
+            for size in sorted(sizes):
+                s, t = make_pair(size, kind)
+                number, times = measure(fn, s, t, repeats, warmup, min_time)
+                row = {'kernel': name, 'kind': kind, 'size': size, 'cells': size * size,
+                       'number': number, 'repeats': repeats, 'times': times, **summarize(times)}
+                results.append(row)
+                if verbose:
+                    print(f"{name:>13} {kind:>6} {size:>6}  median {row['median'] * 1e3:10.4f} ms"
+                          f"  iqr {row['iqr'] * 1e3:8.4f} ms")
+                if row['median'] > max_call:
+                    break
+    meta = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'sizes': list(sizes), 'kinds': list(kinds),
+        'repeats': repeats, 'warmup': warmup, 'min_time': min_time,
+    }
+    return {'meta': meta, 'results': results}
+
+
+def save_json(res, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(res, f, indent=2)
+
+
+def compare(new, old, tolerance=0.10):
+    """
+    Print new/old median ratios. A row is a regression when it is slower by
+    more than `tolerance` AND the two IQR ranges do not overlap.
+    Returns the number of regressions.
+    """
+    base = {(r['kernel'], r['kind'], r['size']): r for r in old['results']}
+    n_bad = 0
+    print(f"{'kernel':>13} {'kind':>6} {'size':>6} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for r in new['results']:
+        o = base.get((r['kernel'], r['kind'], r['size']))
+        if o is None:
+            continue
+        ratio = r['median'] / o['median'] if o['median'] > 0 else float('inf')
+        slower = ratio > 1 + tolerance and r['q1'] > o['q3']
+        n_bad += slower
+        flag = '  REGRESSION' if slower else ''
+        print(f"{r['kernel']:>13} {r['kind']:>6} {r['size']:>6} {o['median'] * 1e3:10.4f} "
+              f"{r['median'] * 1e3:10.4f} {ratio:7.2f}{flag}")
+    return n_bad
+
+
+def plot(res, path, kind='random'):
+    """Median time vs n*m (log-log) per kernel, IQR as error bars."""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    for name in dict.fromkeys(r['kernel'] for r in res['results']):
+        rows = [r for r in res['results'] if r['kernel'] == name and r['kind'] == kind]
+        if not rows:
+            continue
+        x = [r['cells'] for r in rows]
+        y = [r['median'] for r in rows]
+        err = [[r['median'] - r['q1'] for r in rows], [r['q3'] - r['median'] for r in rows]]
+        plt.errorbar(x, y, yerr=err, marker='o', capsize=3, label=name)
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.xlabel('n * m')
+    plt.ylabel('time per call (s)')
+    plt.title(f'Levenshtein kernels ({kind} strings)')
+    plt.legend()
+    plt.savefig(path)
+    plt.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000, 2000, 5000])
+    ap.add_argument('--kinds', nargs='+', default=['random', 'near'], choices=['random', 'near'])
+    ap.add_argument('--kernels', nargs='+', default=list(KERNELS), choices=list(KERNELS))
+    ap.add_argument('--repeats', type=int, default=7)
+    ap.add_argument('--warmup', type=int, default=1)
+    ap.add_argument('--min-time', type=float, default=0.05)
+    ap.add_argument('--max-call', type=float, default=5.0)
+    ap.add_argument('--out', default='bench_lev.json')
+    ap.add_argument('--plot', help='png path')
+    ap.add_argument('--compare', help='older json to diff against')
+    args = ap.parse_args()
+
+    res = run_suite({k: KERNELS[k] for k in args.kernels}, args.sizes, args.kinds,
+                    args.repeats, args.warmup, args.min_time, args.max_call)
+    save_json(res, args.out)
+    print(f"saved {args.out}")
+    if args.plot:
+        plot(res, args.plot)
+        print(f"saved {args.plot}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old = json.load(f)
+        if compare(res, old):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+bench_lev_index.py
+
+BK-tree and SymSpell vs brute force (lev_batch over the whole catalogue).
+
+For every catalogue size: build time, then mean ms per query for
+"all strings within k" and "nearest string". Queries are catalogue
+strings with 1-2 random edits, so the answers are non-empty.
+
+    python bench_lev_index.py --sizes 10000 100000 1000000 --k 2
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from lev_batch import lev_batch
+from lev_index import BKTree, SymSpell
+
+
+def make_catalogue(n, seed=0):
+    """Product-like strings: 2-4 random 'words'."""
+    rng = random.Random(seed)
+    syll = ['ba', 'co', 'de', 'fi', 'go', 'la', 'mo', 'ni', 'pa', 'ri', 'sa', 'to', 'vi', 'xe', 'zu']
+    words = [''.join(rng.choices(syll, k=rng.randint(2, 4))) for _ in range(max(100, n // 20))]
+    # dict keeps insertion order: same catalogue (and queries) on every run
+    return list(dict.fromkeys(' '.join(rng.choices(words, k=rng.randint(2, 4))) for _ in range(n)))
+
+
+def make_queries(catalogue, n, seed=1):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        s = list(rng.choice(catalogue))
+        for _ in range(rng.randint(1, 2)):
+            i = rng.randrange(len(s))
+            s[i] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+        out.append(''.join(s))
+    return out
+
+
+class BruteForce:
+    """Linear scan, distances computed in one vectorized batch."""
+
+    def __init__(self, words):
+        self.words = list(words)
+
+    def within(self, q, k):
+        d = lev_batch([q] * len(self.words), self.words)
+        hits = np.flatnonzero(d <= k)
+        return sorted(((self.words[i], int(d[i])) for i in hits), key=lambda x: x[1])
+
+    def nearest(self, q):
+        d = lev_batch([q] * len(self.words), self.words)
+        i = int(np.argmin(d))
+        return self.words[i], int(d[i])
+
+
+def timed(fn, queries):
+    t0 = time.perf_counter()
+    res = [fn(q) for q in queries]
+    return (time.perf_counter() - t0) / len(queries) * 1000, res
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    ap.add_argument('--queries', type=int, default=200)
+    ap.add_argument('--brute-queries', type=int, default=5, help='queries for the (slow) linear scan')
+    ap.add_argument('--k', type=int, default=2)
+    args = ap.parse_args()
+
+    print(f"{'size':>8} {'index':>9} {'build s':>8} {'within ms':>10} {'nearest ms':>11}")
+    for n in args.sizes:
+        catalogue = make_catalogue(n)
+        queries = make_queries(catalogue, args.queries)
+
+        builders = {
+            'brute': lambda: BruteForce(catalogue),
+            'bktree': lambda: BKTree(catalogue),
+            'symspell': lambda: SymSpell(catalogue, max_edit=args.k),
+        }
+        results = {}
+        for name, build in builders.items():
+            t0 = time.perf_counter()
+            index = build()
+            build_s = time.perf_counter() - t0
+
+            qs = queries[:args.brute_queries] if name == 'brute' else queries
+            within_ms, within = timed(lambda q: index.within(q, args.k), qs)
+            nearest_ms, nearest = timed(index.nearest, qs)
+            results[name] = (within, nearest)
+            print(f"{len(catalogue):>8} {name:>9} {build_s:>8.2f} {within_ms:>10.3f} {nearest_ms:>11.3f}")
+
+        # sanity: indexes agree with the linear scan on the shared queries
+        ref_within, ref_nearest = results['brute']
+        for name in ('bktree', 'symspell'):
+            within, nearest = results[name]
+            for i in range(len(ref_within)):
+                assert sorted(within[i]) == sorted(ref_within[i]), (name, queries[i])
+                assert nearest[i] is None or nearest[i][1] == ref_nearest[i][1], (name, queries[i])
+
+
+if __name__ == '__main__':
+    main()
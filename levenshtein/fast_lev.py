@@ -0,0 +1,188 @@
+"""
+fast_lev.py
+
+Faster edit-distance kernels, same results as lev() in levenshtein.py.
+
+- myers   : bit-parallel algorithm (Myers 1999, Hyyrö's version for
+            Levenshtein). One column of the DP = a few integer operations.
+            Python ints have no fixed width, so long strings are handled
+            as one multi-word bit vector (the "blocks" are CPython's 30-bit
+            limbs, processed in C).
+- banded  : Ukkonen's DP restricted to the diagonals |i - j| <= k, stops
+            as soon as every cell of a row is above k.
+- distance: picks one of the two, with an optional max_distance cutoff.
+
+With max_distance=k the result is exact when it is <= k, otherwise k + 1.
+
+    python fast_lev.py      # randomized check against lev()
+"""
+
+
+def myers(s, t, max_distance=None):
+    """Levenshtein distance with the bit-vector algorithm."""
+    # the shorter string is the bit pattern
+    if len(s) < len(t):
+        s, t = t, s
+    n, m = len(s), len(t)
+    if m == 0:
+        return n if max_distance is None else min(n, max_distance + 1)
+
+    peq = {}
+    for i, c in enumerate(t):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv = full, 0
+    score = m
+
+    for j, c in enumerate(s):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        # the top row of the matrix is 0, 1, 2, ... so the carry-in is +1
+        ph = (ph << 1) | 1
+        mh = mh << 1
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv & full
+
+        # the score can only drop by 1 per remaining column
+        if max_distance is not None and score - (n - j - 1) > max_distance:
+            return max_distance + 1
+
+    if max_distance is not None and score > max_distance:
+        return max_distance + 1
+    return score
+
+
+def banded(s, t, max_distance):
+    """Levenshtein distance if <= max_distance, else max_distance + 1."""
+    k = max_distance
+    if len(s) < len(t):
+        s, t = t, s
+    n, m = len(s), len(t)
+    if n - m > k:
+        return k + 1
+
+    # band[d] holds D[i][j] for j = i + d - k
+    big = k + 1
+    width = 2 * k + 1
+    prev = [big] * width
+    for d in range(k, width):
+        j = d - k
+        if j <= m:
+            prev[d] = j
+
+    for i in range(1, n + 1):
+        curr = [big] * width
+        row_min = big
+        si = s[i - 1]
+        for d in range(width):
+            j = i + d - k
+            if j < 0 or j > m:
+                continue
+            if j == 0:
+                v = i
+            else:
+                v = prev[d] + (si != t[j - 1])
+                if d + 1 < width and prev[d + 1] + 1 < v:
+                    v = prev[d + 1] + 1
+                if d > 0 and curr[d - 1] + 1 < v:
+                    v = curr[d - 1] + 1
+            if v > big:
+                v = big
+            curr[d] = v
+            if v < row_min:
+                row_min = v
+        if row_min > k:
+            return k + 1
+        prev = curr
+
+    return min(prev[m - n + k], k + 1)
+
+
+def distance(s, t, max_distance=None):
+    """
+    Levenshtein distance between s and t.
+
+    Common prefix / suffix are stripped first (they never change the
+    distance). With a small max_distance on long strings the banded DP
+    is used, otherwise the bit-parallel kernel.
+    """
+    s, t = str(s), str(t)
+    if s == t:
+        return 0
+
+    # strip common prefix and suffix
+    p = 0
+    end = min(len(s), len(t))
+    while p < end and s[p] == t[p]:
+        p += 1
+    q = 0
+    while q < end - p and s[-1 - q] == t[-1 - q]:
+        q += 1
+    s, t = s[p:len(s) - q], t[p:len(t) - q]
+
+    if max_distance is None:
+        return myers(s, t)
+    if abs(len(s) - len(t)) > max_distance:
+        return max_distance + 1
+    # the python band only beats the C-level bit vectors when it is narrow
+    if (2 * max_distance + 1) * 64 < min(len(s), len(t)):
+        return banded(s, t, max_distance)
+    return myers(s, t, max_distance)
+
+
+def check_against_lev(n_pairs=2000, seed=0):
+    """Compare every kernel with lev() on random strings, raise on mismatch."""
+    import random
+
+    from levenshtein import lev
+
+    rng = random.Random(seed)
+    for _ in range(n_pairs):
+        alphabet = rng.choice(['ab', 'abcd', 'abcdefghijklmnopqrstuvwxyz', 'aé€ 🙂'])
+        s = ''.join(rng.choices(alphabet, k=rng.randint(0, 150)))
+        # mix unrelated pairs with near duplicates
+        if rng.random() < 0.5:
+            t = list(s)
+            for _ in range(rng.randint(0, 6)):
+                i = rng.randint(0, len(t))
+                op = rng.choice('ids')
+                if op == 'i':
+                    t.insert(i, rng.choice(alphabet))
+                elif t and i < len(t):
+                    if op == 'd':
+                        del t[i]
+                    else:
+                        t[i] = rng.choice(alphabet)
+            t = ''.join(t)
+        else:
+            t = ''.join(rng.choices(alphabet, k=rng.randint(0, 150)))
+
+        want = lev(s, t)
+        k = rng.randint(0, 20)
+        capped = min(want, k + 1)
+        got = {
+            'myers': myers(s, t),
+            'distance': distance(s, t),
+            'myers_k': myers(s, t, k),
+            'banded_k': banded(s, t, k),
+            'distance_k': distance(s, t, k),
+        }
+        for name, v in got.items():
+            expected = capped if name.endswith('_k') else want
+            if v != expected:
+                raise AssertionError(f"{name}({s!r}, {t!r}, k={k}) = {v}, lev = {want}")
+    return n_pairs
+
+
+if __name__ == "__main__":
+    n = check_against_lev()
+    print(f"{n} random pairs: all kernels match lev()")
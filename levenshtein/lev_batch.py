@@ -0,0 +1,131 @@
+"""
+lev_batch.py
+
+Levenshtein distances for many pairs at once.
+
+Short pairs are bucketed by length and padded to a common size, then the
+DP is run one anti-diagonal at a time with NumPy over the whole bucket:
+every cell of a diagonal only depends on the two previous diagonals, so
+a diagonal is one vectorized min() for all pairs. Padding never changes a
+result because D[n][m] only depends on the first n / m characters.
+
+Long pairs (where the O(n*m) diagonals get too wide) go to fast_lev.distance,
+through a multiprocessing pool when there are enough of them.
+"""
+
+import os
+from multiprocessing import Pool
+
+import numpy as np
+
+from fast_lev import distance
+
+
+def _codes(strs, width):
+    # (len(strs), width) array of code points, padded with 0
+    buf = ''.join(x.ljust(width, '\0') for x in strs).encode('utf-32-le')
+    return np.frombuffer(buf, dtype=np.uint32).reshape(len(strs), width)
+
+
+def _diag_dp(a, b):
+    """Distances for equal-count lists a, b, all strings short."""
+    n = np.fromiter(map(len, a), dtype=np.int64, count=len(a))
+    m = np.fromiter(map(len, b), dtype=np.int64, count=len(b))
+    N, M = int(n.max()), int(m.max())
+    out = np.empty(len(a), dtype=np.int64)
+    if N == 0 or M == 0:
+        return n + m
+
+    A, B = _codes(a, N), _codes(b, M)
+    P = len(a)
+    # three rotating diagonals, indexed by i (row of the DP matrix)
+    prev2 = np.zeros((P, N + 1), dtype=np.int32)
+    prev1 = np.zeros((P, N + 1), dtype=np.int32)
+    cur = np.zeros((P, N + 1), dtype=np.int32)
+    prev1[:, 0] = 1
+    prev1[:, 1] = 1
+
+    total = n + m
+    done = total <= 1
+    out[done] = total[done]
+    order = np.argsort(total, kind='stable')
+    pos = np.searchsorted(total[order], 2)
+
+    for d in range(2, N + M + 1):
+        lo, hi = max(0, d - M), min(N, d)
+        # inner cells: i >= 1 and j = d - i >= 1
+        i0, i1 = max(1, lo), min(hi, d - 1)
+        if i0 <= i1:
+            i = np.arange(i0, i1 + 1)
+            sub = prev2[:, i0 - 1:i1] + (A[:, i0 - 1:i1] != B[:, d - i - 1])
+            np.minimum(prev1[:, i0 - 1:i1], prev1[:, i0:i1 + 1], out=cur[:, i0:i1 + 1])
+            cur[:, i0:i1 + 1] += 1
+            np.minimum(cur[:, i0:i1 + 1], sub, out=cur[:, i0:i1 + 1])
+        # borders: D[0][d] = d and D[d][0] = d
+        if lo == 0:
+            cur[:, 0] = d
+        if hi == d:
+            cur[:, d] = d
+
+        # pairs whose last cell D[n][m] sits on this diagonal
+        end = pos
+        while end < P and total[order[end]] == d:
+            end += 1
+        if end > pos:
+            sel = order[pos:end]
+            out[sel] = cur[sel, n[sel]]
+            pos = end
+
+        prev2, prev1, cur = prev1, cur, prev2
+
+    return out
+
+
+def _distance_pair(pair):
+    return distance(*pair)
+
+
+def lev_batch(a, b, long_len=128, bucket=8, chunk=4096, n_jobs=None, min_pool=256):
+    """
+    Levenshtein distance of every (a[i], b[i]) pair as a NumPy int array.
+
+    long_len : pairs with a string longer than this skip the NumPy DP
+    bucket   : length granularity of the padding buckets
+    chunk    : max pairs per NumPy call (bounds memory)
+    n_jobs   : processes for the long pairs (default: all cores)
+    min_pool : below this many long pairs no pool is started
+    """
+    a = [str(x) for x in a]
+    b = [str(x) for x in b]
+    if len(a) != len(b):
+        raise ValueError(f"a and b must have the same length ({len(a)} != {len(b)})")
+    out = np.zeros(len(a), dtype=np.int64)
+    if not a:
+        return out
+
+    la = np.fromiter(map(len, a), dtype=np.int64, count=len(a))
+    lb = np.fromiter(map(len, b), dtype=np.int64, count=len(b))
+    long_rows = np.flatnonzero(np.maximum(la, lb) > long_len)
+    short_rows = np.flatnonzero(np.maximum(la, lb) <= long_len)
+
+    # bucket short pairs by (len a, len b) rounded up to `bucket`
+    keys = ((la[short_rows] + bucket - 1) // bucket) * (long_len + 1) + (lb[short_rows] + bucket - 1) // bucket
+    order = short_rows[np.argsort(keys, kind='stable')]
+    sorted_keys = np.sort(keys, kind='stable')
+    bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+    for group in np.split(order, bounds):
+        for start in range(0, len(group), chunk):
+            rows = group[start:start + chunk]
+            out[rows] = _diag_dp([a[r] for r in rows], [b[r] for r in rows])
+
+    if len(long_rows):
+        pairs = [(a[r], b[r]) for r in long_rows]
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if n_jobs > 1 and len(pairs) >= min_pool:
+            with Pool(n_jobs) as pool:
+                res = pool.map(_distance_pair, pairs, chunksize=max(1, len(pairs) // (4 * n_jobs)))
+        else:
+            res = [_distance_pair(p) for p in pairs]
+        out[long_rows] = res
+
+    return out
@@ -0,0 +1,157 @@
+"""
+lev_index.py
+
+Fuzzy search indexes on top of the Levenshtein kernels.
+
+- BKTree  : metric tree, children keyed by their distance to the parent.
+            The triangle inequality prunes every branch outside
+            [d - k, d + k]. Works for any radius.
+- SymSpell: deletion index. Every string is stored under all the variants
+            obtained by deleting up to max_edit characters (of its first
+            prefix_len characters). A query generates its own deletes and
+            only the strings sharing one of them are checked. Very fast
+            for small radii (1-2), memory grows with max_edit.
+
+Both answer within(q, k) -> [(string, dist)] and nearest(q) -> (string, dist).
+"""
+
+from fast_lev import distance
+
+
+class BKTree:
+    """Burkhard-Keller tree over a list of strings."""
+
+    def __init__(self, words=()):
+        self.words = []
+        self.children = []  # one {dist: node} dict per node
+        for w in words:
+            self.add(w)
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        word = str(word)
+        if not self.words:
+            self.words.append(word)
+            self.children.append({})
+            return
+        node = 0
+        while True:
+            d = distance(word, self.words[node])
+            if d == 0:
+                return  # already there
+            nxt = self.children[node].get(d)
+            if nxt is None:
+                self.children[node][d] = len(self.words)
+                self.words.append(word)
+                self.children.append({})
+                return
+            node = nxt
+
+    def within(self, query, k):
+        """All (word, dist) with dist <= k, closest first."""
+        query = str(query)
+        out = []
+        stack = [0] if self.words else []
+        while stack:
+            node = stack.pop()
+            d = distance(query, self.words[node])
+            if d <= k:
+                out.append((self.words[node], d))
+            for cd, child in self.children[node].items():
+                if d - k <= cd <= d + k:
+                    stack.append(child)
+        out.sort(key=lambda x: x[1])
+        return out
+
+    def nearest(self, query, max_distance=None):
+        """Closest (word, dist), or None if nothing within max_distance."""
+        query = str(query)
+        if not self.words:
+            return None
+        best = None
+        best_d = float('inf') if max_distance is None else max_distance + 1
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            d = distance(query, self.words[node])
+            if d < best_d:
+                best, best_d = self.words[node], d
+                if d == 0:
+                    break
+            # children outside the current radius cannot beat best_d,
+            # the most promising one (cd closest to d) is popped first
+            near = [(abs(cd - d), child) for cd, child in self.children[node].items() if abs(cd - d) < best_d]
+            near.sort(reverse=True)
+            stack.extend(child for _, child in near)
+        return None if best is None else (best, best_d)
+
+
+class SymSpell:
+    """Symmetric delete index for radius <= max_edit."""
+
+    def __init__(self, words=(), max_edit=2, prefix_len=7):
+        self.max_edit = max_edit
+        self.prefix_len = prefix_len
+        self.words = []
+        self.index = {}  # delete variant -> list of word ids
+        self._seen = set()
+        for w in words:
+            self.add(w)
+
+    def __len__(self):
+        return len(self.words)
+
+    def _deletes(self, word, k):
+        # word itself + every variant with up to k characters removed
+        out = {word}
+        level = {word}
+        for _ in range(k):
+            nxt = set()
+            for w in level:
+                for i in range(len(w)):
+                    nxt.add(w[:i] + w[i + 1:])
+            nxt -= out
+            out |= nxt
+            level = nxt
+        return out
+
+    def add(self, word):
+        word = str(word)
+        if word in self._seen:
+            return
+        self._seen.add(word)
+        wid = len(self.words)
+        self.words.append(word)
+        # only the prefix is indexed, it keeps the index small on long strings
+        for v in self._deletes(word[:self.prefix_len], self.max_edit):
+            self.index.setdefault(v, []).append(wid)
+
+    def within(self, query, k=None):
+        """All (word, dist) with dist <= k (k <= max_edit), closest first."""
+        query = str(query)
+        k = self.max_edit if k is None else k
+        if k > self.max_edit:
+            raise ValueError(f"k={k} is above the index max_edit={self.max_edit}")
+        seen = set()
+        out = []
+        for v in self._deletes(query[:self.prefix_len], k):
+            for wid in self.index.get(v, ()):
+                if wid in seen:
+                    continue
+                seen.add(wid)
+                d = distance(query, self.words[wid], k)
+                if d <= k:
+                    out.append((self.words[wid], d))
+        out.sort(key=lambda x: x[1])
+        return out
+
+    def nearest(self, query, max_distance=None):
+        """Closest (word, dist) within max_distance (default max_edit), else None."""
+        k_max = self.max_edit if max_distance is None else min(max_distance, self.max_edit)
+        for k in range(k_max + 1):
+            hits = self.within(query, k)
+            if hits:
+                return hits[0]
+        return None
@@ -1,9 +1,8 @@
 import pandas as pd
 import numpy as np
-import time
 import matplotlib.pyplot as plt
-import random
-import string
+
+from lev_batch import lev_batch
 
 # algo for distance
 def lev(s, t):
@@ -32,57 +31,53 @@ def lev(s, t):
     
     return curr[m]
 
-# --- csv part ---
-print("doing csv stuff...")
-df = pd.read_csv(r'C:\information_retrieval\levenshtein_pairs.csv', names=['s', 't'])
+if __name__ == "__main__":
+    from bench_lev import plot, run_suite, save_json
 
-# run calc
-df['dist'] = df.apply(lambda r: lev(str(r['s']), str(r['t'])), axis=1)
+    # --- csv part ---
+    print("doing csv stuff...")
+    df = pd.read_csv(r'C:\information_retrieval\levenshtein_pairs.csv', names=['s', 't'])
 
-print("results:")
-print(df)
+    # run calc (all pairs at once, same values as lev)
+    df['dist'] = lev_batch(df['s'].astype(str), df['t'].astype(str))
 
-df.to_csv(r'C:\information_retrieval\levenshtein_pairs_results.csv', index=False)
+    print("results:")
+    print(df)
 
-# --- complexity check ---
-print("\nchecking speed...")
-lens = [100, 500, 1000, 2000]
-times = []
-prods = []
+    df.to_csv(r'C:\information_retrieval\levenshtein_pairs_results.csv', index=False)
 
-for l in lens:
-    s = ''.join(random.choices(string.ascii_lowercase, k=l))
-    t = ''.join(random.choices(string.ascii_lowercase, k=l))
-    
-    t0 = time.time()
-    x = lev(s, t)
-    t1 = time.time()
-    
-    diff = t1 - t0
-    p = l * l
-    
-    times.append(diff)
-    prods.append(p)
-    print(f"len {l}: {diff:.4f}s")
+    # --- complexity check ---
+    # median of repeated perf_counter runs for every kernel (see bench_lev.py)
+    print("\nchecking speed...")
+    lens = [100, 500, 1000, 2000]
+    bench = run_suite(sizes=lens, kinds=['random'])
+    save_json(bench, r'C:\information_retrieval\levenshtein_complexity.json')
+
+    rows = [r for r in bench['results'] if r['kernel'] == 'lev']
+    times = [r['median'] for r in rows]
+    prods = [r['cells'] for r in rows]
+    for r in rows:
+        print(f"len {r['size']}: {r['median']:.4f}s (iqr {r['iqr']:.4f}s)")
 
-# --- plotting ---
-print("\nmaking graph...")
-plt.figure(figsize=(10, 6))
+    # --- plotting ---
+    print("\nmaking graph...")
+    plt.figure(figsize=(10, 6))
 
-plt.scatter(prods, times, color='blue', label='data')
+    plt.scatter(prods, times, color='blue', label='data')
 
-# regression line
-z = np.polyfit(prods, times, 1)
-p = np.poly1d(z)
+    # regression line
+    z = np.polyfit(prods, times, 1)
+    p = np.poly1d(z)
 
-plt.plot(prods, p(prods), color='red', label='fit')
+    plt.plot(prods, p(prods), color='red', label='fit')
 
-plt.xlabel('n * m')
-plt.ylabel('time (s)')
-plt.title('Levenshtein Complexity')
-plt.legend()
+    plt.xlabel('n * m')
+    plt.ylabel('time (s)')
+    plt.title('Levenshtein Complexity')
+    plt.legend()
 
-plt.savefig(r'C:\information_retrieval\levenshtein_complexity.png')
-print("graph saved.")
-print(f"slope: {z[0]}")
-print("finished assignment 1.")
+    plt.savefig(r'C:\information_retrieval\levenshtein_complexity.png')
+    plot(bench, r'C:\information_retrieval\levenshtein_kernels.png')
+    print("graph saved.")
+    print(f"slope: {z[0]}")
+    print("finished assignment 1.")
@@ -3,10 +3,16 @@
 
 # %%
 import os
-import re
+import csv
 import json
+import time
+import hashlib
+import sqlite3
+from collections import deque
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
 
 # %% [markdown]
 # 1. CONFIGURATION
@@ -16,6 +22,42 @@ DOSSIER_SORTIE = os.path.dirname(os.path.abspath(__file__))
 NOM_DOSSIER_HTML = "deliveroo" 
 DOSSIER_HTML = os.path.join(DOSSIER_SORTIE, NOM_DOSSIER_HTML)
 
+# Ingestion parallèle : nombre de processus (1 = séquentiel, None = tous les coeurs),
+# nombre de fichiers envoyés à la fois à un processus, et lots en cours au maximum par processus
+N_PROCESSUS = None
+TAILLE_LOT = 64
+LOTS_EN_COURS = 2
+
+# Parseur BeautifulSoup : "html.parser" (pur Python, par défaut) ou "lxml" (en C, bien plus rapide s'il est installé)
+PARSEUR = "html.parser"
+# True = ne construit que les <table> du mail (SoupStrainer) : toutes les infos extraites sont dans des tableaux.
+# A vérifier sur un échantillon avant de l'activer sur une nouvelle archive.
+TABLES_SEULEMENT = False
+# True = affiche à la fin le temps passé dans chaque règle d'extraction (tous processus confondus)
+PROFIL = False
+
+# Mode incrémental : seuls les fichiers nouveaux (ou modifiés) sont analysés, les sorties sont complétées.
+# Le manifeste (base SQLite) garde pour chaque fichier : taille, date de modification, empreinte sha256,
+# et à part, les lignes extraites de ce fichier.
+INCREMENTAL = True
+MANIFESTE = os.path.join(DOSSIER_SORTIE, 'deliveroo_manifeste.sqlite')
+
+# Export en flux (mémoire constante) : None, "jsonl" (une commande par ligne) ou "json" (tableau JSON).
+# Une commande par fichier, dans l'ordre des fichiers ; sans mode incrémental, le CSV est lui aussi écrit
+# au fil de l'eau et le JSON hiérarchique (qui regroupe et trie toutes les commandes) n'est pas produit.
+SORTIE_FLUX = None
+
+# Export Parquet (nécessite pyarrow, optionnel) : tables normalisées commandes + articles, champs typés.
+# Les tables sont reconstruites en entier (toute l'archive en mémoire) quand des lignes ont changé ;
+# ignoré en mode flux sans mode incrémental, pour garder la mémoire constante.
+SORTIE_PARQUET = False
+
+# Colonnes des lignes extraites (ordre du CSV)
+COLONNES = ['Date_File', 'Order_ID', 'Total_Paid', 'Delivery_Fee',
+            'Rest_Name', 'Rest_Address', 'Rest_City', 'Rest_Zip', 'Rest_Phone',
+            'Cust_Name', 'Cust_Address', 'Cust_City', 'Cust_Zip', 'Cust_Phone',
+            'Item_Qty', 'Item_Name', 'Item_Price']
+
 # %% [markdown]
 # 2. FONCTIONS UTILITAIRES
 # 
@@ -27,159 +69,606 @@ def clean_text(tag):
         return tag.get_text(strip=True).replace('\xa0', ' ').replace('&amp;', '&')
     return ""
 
+# %% [markdown]
+# Passe unique sur l'arbre HTML.
+# Au lieu de cinq recherches (find / find_all) qui parcourent chacune tout le document,
+# un seul parcours de soup.descendants collecte tout ce dont l'extraction a besoin,
+# dans le même ordre (ordre du document) que les anciennes recherches.
+
+# %%
+TEXTE_COMMANDE = "Commande n°"
+TEXTE_FRAIS = "Frais de livraison"
+
+
+def parcours_unique(soup):
+    cmd_tag = None      # 1er texte contenant "Commande n°"
+    del_tag = None      # 1er texte contenant "Frais de livraison"
+    total_tag = None    # 1er <p class="total">
+    fluid_tables = []   # tous les <table class="fluid">
+    qty_cells = []      # tous les <td width="40">
+    for el in soup.descendants:
+        if isinstance(el, NavigableString):
+            if cmd_tag is None and TEXTE_COMMANDE in el:
+                cmd_tag = el
+            if del_tag is None and TEXTE_FRAIS in el:
+                del_tag = el
+            continue
+        name = el.name
+        if name == 'td':
+            if el.get('width') == "40":
+                qty_cells.append(el)
+        elif name == 'table':
+            if 'fluid' in el.get('class', ()):
+                fluid_tables.append(el)
+        elif name == 'p':
+            if total_tag is None and 'total' in el.get('class', ()):
+                total_tag = el
+    return cmd_tag, fluid_tables, total_tag, del_tag, qty_cells
+
+
+def _chrono(profil, regle, t0):
+    # Ajoute le temps écoulé depuis t0 à la règle et renvoie le nouvel instant de départ
+    t = time.perf_counter()
+    profil[regle] = profil.get(regle, 0.0) + (t - t0)
+    return t
+
 # %% [markdown]
 # Fonction pour lire un fichier HTML et extrait la liste des articles commandés.
+# Si un dictionnaire `profil` est donné, le temps de chaque règle d'extraction y est cumulé.
 
 # %%
-def extract_data_from_html(filepath, filename):
+def extract_data_from_html(filepath, filename, parser='html.parser', tables_only=False, profil=None):
     items_extracted = []
-    # Ouverture et analyse du fichier HTML avec BeautifulSoup
+    profil = {} if profil is None else profil
+    t = time.perf_counter()
+    # Ouverture et analyse du fichier HTML avec BeautifulSoup (uniquement les tableaux si tables_only)
+    parse_only = SoupStrainer('table') if tables_only else None
     with open(filepath, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f, 'html.parser')
-
-        # A. INFO COMMANDE
-        # Extrait la date depuis le nom du fichier et l'ID de commande via le texte "Commande n°"
-        raw_date = filename.split('.')[0].replace('_', ' ')
-        cmd_tag = soup.find(string=re.compile("Commande n°"))
-        order_number = cmd_tag.strip().split(' ')[-1] if cmd_tag else "N/A"
-
-        # B. ADRESSES (RESTAURANT & CLIENT)
-        fluid_tables = soup.find_all('table', class_='fluid')
-        r_data = [""] * 5 # Initialise les listes pour : Nom, Adresse, Ville, Code Postal, Tel
-        c_data = [""] * 5 
-
-        if len(fluid_tables) >= 3:
-            # Restaurant
-            p_rest = fluid_tables[0].find_all('p')
-            if p_rest:
-                r_data = [clean_text(p) for p in p_rest[:5]]
-                r_data += [""] * (5 - len(r_data)) # Ajoute des vides si moins de 5 lignes trouvées
-
-            # Client (même logique que pour le restaurant)
-            p_cust = fluid_tables[2].find_all('p')
-            if p_cust:
-                c_data = [clean_text(p) for p in p_cust[:5]]
-                c_data += [""] * (5 - len(c_data))
-
-        # C. PRIX & FRAIS DE LIVRAISON
-        # Cherche le label "Total", remonte à la cellule parente, puis prend la cellule suivante (le prix)
-        total_paid = "0"
-        total_tag = soup.find('p', class_='total')
-        if total_tag and total_tag.find_parent('td'):
-            next_td = total_tag.find_parent('td').find_next_sibling('td')
-            if next_td: total_paid = clean_text(next_td)
-        
-        # Même logique de navigation pour les frais de livraison
-        delivery_fee = "0"
-        del_tag = soup.find(string=re.compile("Frais de livraison"))
-        if del_tag and del_tag.find_parent('td'):
-            next_td = del_tag.find_parent('td').find_next_sibling('td')
-            if next_td: delivery_fee = clean_text(next_td)
-
-        # D. ARTICLES
-        # Identifie les lignes d'articles via la largeur de cellule fixe (width="40")
-        qty_cells = soup.find_all('td', width="40")
-        for qty_cell in qty_cells:
-            row = qty_cell.find_parent('tr') # Récupère toute la ligne
-            cols = row.find_all('td') # Récupère les colonnes
-            if len(cols) >= 3: # Extraction : Quantité (col 1), Nom (col 2), Prix (col 3)
-                qty = clean_text(cols[0]).lower().replace('x', '')
-                item_name_cell = cols[1]
-                item_name = clean_text(item_name_cell.find('p')) if item_name_cell.find('p') else clean_text(item_name_cell)
-                item_price = clean_text(cols[2])
-                
-                # Ajoute l'article à la liste finale avec TOUTES les infos de la commande (date, adresses, etc.)
-                items_extracted.append({
-                    'Date_File': raw_date,
-                    'Order_ID': order_number,
-                    'Total_Paid': total_paid,
-                    'Delivery_Fee': delivery_fee,
-                    'Rest_Name': r_data[0], 'Rest_Address': r_data[1], 'Rest_City': r_data[2], 'Rest_Zip': r_data[3], 'Rest_Phone': r_data[4],
-                    'Cust_Name': c_data[0], 'Cust_Address': c_data[1], 'Cust_City': c_data[2], 'Cust_Zip': c_data[3], 'Cust_Phone': c_data[4],
-                    'Item_Qty': qty, 'Item_Name': item_name, 'Item_Price': item_price
-                })
+        soup = BeautifulSoup(f, parser, parse_only=parse_only)
+    t = _chrono(profil, 'lecture + parsing', t)
+
+    # Un seul parcours de l'arbre pour toutes les règles
+    cmd_tag, fluid_tables, total_tag, del_tag, qty_cells = parcours_unique(soup)
+    t = _chrono(profil, 'parcours unique', t)
+
+    # A. INFO COMMANDE
+    # Extrait la date depuis le nom du fichier et l'ID de commande via le texte "Commande n°"
+    raw_date = filename.split('.')[0].replace('_', ' ')
+    order_number = cmd_tag.strip().split(' ')[-1] if cmd_tag else "N/A"
+    t = _chrono(profil, 'commande', t)
+
+    # B. ADRESSES (RESTAURANT & CLIENT)
+    r_data = [""] * 5 # Initialise les listes pour : Nom, Adresse, Ville, Code Postal, Tel
+    c_data = [""] * 5 
+
+    if len(fluid_tables) >= 3:
+        # Restaurant
+        p_rest = fluid_tables[0].find_all('p')
+        if p_rest:
+            r_data = [clean_text(p) for p in p_rest[:5]]
+            r_data += [""] * (5 - len(r_data)) # Ajoute des vides si moins de 5 lignes trouvées
+
+        # Client (même logique que pour le restaurant)
+        p_cust = fluid_tables[2].find_all('p')
+        if p_cust:
+            c_data = [clean_text(p) for p in p_cust[:5]]
+            c_data += [""] * (5 - len(c_data))
+    t = _chrono(profil, 'adresses', t)
+
+    # C. PRIX & FRAIS DE LIVRAISON
+    # Part du label "Total", remonte à la cellule parente, puis prend la cellule suivante (le prix)
+    total_paid = "0"
+    if total_tag and total_tag.find_parent('td'):
+        next_td = total_tag.find_parent('td').find_next_sibling('td')
+        if next_td: total_paid = clean_text(next_td)
+    t = _chrono(profil, 'total', t)
+
+    # Même logique de navigation pour les frais de livraison
+    delivery_fee = "0"
+    if del_tag and del_tag.find_parent('td'):
+        next_td = del_tag.find_parent('td').find_next_sibling('td')
+        if next_td: delivery_fee = clean_text(next_td)
+    t = _chrono(profil, 'frais de livraison', t)
+
+    # D. ARTICLES
+    # Lignes d'articles repérées par la largeur de cellule fixe (width="40")
+    for qty_cell in qty_cells:
+        row = qty_cell.find_parent('tr') # Récupère toute la ligne
+        cols = row.find_all('td') # Récupère les colonnes
+        if len(cols) >= 3: # Extraction : Quantité (col 1), Nom (col 2), Prix (col 3)
+            qty = clean_text(cols[0]).lower().replace('x', '')
+            item_name_cell = cols[1]
+            item_name = clean_text(item_name_cell.find('p')) if item_name_cell.find('p') else clean_text(item_name_cell)
+            item_price = clean_text(cols[2])
+            
+            # Ajoute l'article à la liste finale avec TOUTES les infos de la commande (date, adresses, etc.)
+            items_extracted.append({
+                'Date_File': raw_date,
+                'Order_ID': order_number,
+                'Total_Paid': total_paid,
+                'Delivery_Fee': delivery_fee,
+                'Rest_Name': r_data[0], 'Rest_Address': r_data[1], 'Rest_City': r_data[2], 'Rest_Zip': r_data[3], 'Rest_Phone': r_data[4],
+                'Cust_Name': c_data[0], 'Cust_Address': c_data[1], 'Cust_City': c_data[2], 'Cust_Zip': c_data[3], 'Cust_Phone': c_data[4],
+                'Item_Qty': qty, 'Item_Name': item_name, 'Item_Price': item_price
+            })
+    _chrono(profil, 'articles', t)
 
     return items_extracted
 
+
+def afficher_profil(profil, n_fichiers):
+    # Temps total et par fichier de chaque règle, de la plus coûteuse à la moins coûteuse
+    total = sum(profil.values()) or 1.0
+    print(f"{'règle':<20} {'total s':>9} {'ms/fichier':>11} {'part':>6}")
+    for regle, sec in sorted(profil.items(), key=lambda x: -x[1]):
+        print(f"{regle:<20} {sec:>9.3f} {sec / max(n_fichiers, 1) * 1000:>11.3f} {sec / total:>6.1%}")
+
 # %% [markdown]
-# Fonction pour transformer le DataFrame en structure JSON.
+# Fonctions pour répartir les fichiers sur plusieurs processus.
+# Les fichiers sont envoyés par lots (moins d'allers-retours entre processus) et au plus
+# LOTS_EN_COURS lots par processus sont en attente : la mémoire reste bornée quelle que soit la taille de l'archive.
+# Les résultats reviennent dans l'ordre des fichiers, donc la sortie est identique à la boucle séquentielle.
 
 # %%
+def _extraire_lot(args):
+    dossier, lot, parser, tables_only = args
+    profil = {}
+    data = [extract_data_from_html(os.path.join(dossier, fichier), fichier, parser, tables_only, profil)
+            for fichier in lot]
+    return data, profil
+
+
+def extraire_dossier(dossier, fichiers, n_processus=None, taille_lot=64, lots_en_cours=2,
+                     parser='html.parser', tables_only=False, profil=None):
+    # Générateur : une liste d'articles par fichier, dans l'ordre de `fichiers`
+    # (les temps par règle de tous les processus sont cumulés dans `profil` s'il est donné)
+    n_processus = n_processus or os.cpu_count() or 1
+    lots = ((dossier, fichiers[i:i + taille_lot], parser, tables_only) for i in range(0, len(fichiers), taille_lot))
+
+    def resultats(res):
+        data, p = res
+        if profil is not None:
+            for regle, sec in p.items():
+                profil[regle] = profil.get(regle, 0.0) + sec
+        return data
+
+    if n_processus == 1:
+        for lot in lots:
+            yield from resultats(_extraire_lot(lot))
+        return
+    with ProcessPoolExecutor(n_processus) as ex:
+        en_cours = deque()
+        for lot in lots:
+            en_cours.append(ex.submit(_extraire_lot, lot))
+            if len(en_cours) >= lots_en_cours * n_processus:
+                yield from resultats(en_cours.popleft().result())
+        while en_cours:
+            yield from resultats(en_cours.popleft().result())
+
+# %% [markdown]
+# Construction des commandes JSON.
+# Une commande se construit directement à partir des lignes d'un fichier (sortie de l'extracteur),
+# sans passer par un DataFrame : c'est la même fonction pour le JSON hiérarchique et pour l'export en flux.
+
+# %%
+def commande_depuis_lignes(lignes):
+    # 1. Récupère les informations communes (Date, Resto, Client) sur la première ligne
+    first = lignes[0]
+    # 2. Construit la structure JSON principale pour cette commande
+    return {
+        "order": {
+            "order_datetime": first['Date_File'],
+            "order_number": first['Order_ID'],
+            "delivery_fee": first['Delivery_Fee'],
+            "order_total_paid": first['Total_Paid']
+        },
+        "restaurant": {
+            "name": first['Rest_Name'],
+            "address": first['Rest_Address'],
+            "city": first['Rest_City'],
+            "postcode": first['Rest_Zip'],
+            "phone_number": first['Rest_Phone']
+        },
+        "customer": {
+            "name": first['Cust_Name'],
+            "address": first['Cust_Address'],
+            "city": first['Cust_City'],
+            "postcode": first['Cust_Zip'],
+            "phone_number": first['Cust_Phone']
+        },
+        # 3. Un article par ligne
+        "order_items": [{
+            "name": row['Item_Name'],
+            "quantity": row['Item_Qty'],
+            "price": row['Item_Price']
+        } for row in lignes]
+    }
+
+
+def construire_commandes(df):
+    # Regroupe les lignes par numéro de commande (dans l'ordre des numéros, comme un groupby)
+    groupes = {}
+    for row in df.to_dict('records'):
+        groupes.setdefault(row['Order_ID'], []).append(row)
+    for order_id in sorted(groupes):
+        yield commande_depuis_lignes(groupes[order_id])
+
+
+class FluxCommandes:
+    # Écrit les commandes une par une, sans jamais garder la liste en mémoire.
+    # format 'jsonl' : une commande par ligne (le fichier peut être complété avec mode='a')
+    # format 'json'  : tableau JSON indenté, octet pour octet ce qu'écrirait json.dump(liste, indent=4)
+
+    def __init__(self, path, format='jsonl', mode='w'):
+        if format not in ('jsonl', 'json'):
+            raise ValueError(f"format inconnu : {format!r}")
+        if format == 'json' and mode != 'w':
+            raise ValueError("un tableau JSON ne peut pas être complété, utiliser le format 'jsonl'")
+        self.format = format
+        self.n = 0
+        self.f = open(path, mode, encoding='utf-8')
+
+    def ecrire(self, commande):
+        if self.format == 'jsonl':
+            self.f.write(json.dumps(commande, ensure_ascii=False) + '\n')
+        else:
+            texte = json.dumps(commande, ensure_ascii=False, indent=4).replace('\n', '\n    ')
+            self.f.write(('[\n    ' if self.n == 0 else ',\n    ') + texte)
+        self.n += 1
+
+    def fermer(self):
+        if self.format == 'json':
+            self.f.write('\n]' if self.n else '[]')
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+
 def generate_hierarchical_json(df, output_path):
-    json_output = []
-
-    # 1. Regroupe les lignes par numéro de commande
-    for order_id, group in df.groupby('Order_ID'):
-        # 2. Récupère les informations communes (Date, Resto, Client)
-        first = group.iloc[0]
-        # 3. Construit la structure JSON principale pour cette commande
-        order_obj = {
-            "order": {
-                "order_datetime": first['Date_File'],
-                "order_number": first['Order_ID'],
-                "delivery_fee": first['Delivery_Fee'],
-                "order_total_paid": first['Total_Paid']
-            },
-            "restaurant": {
-                "name": first['Rest_Name'],
-                "address": first['Rest_Address'],
-                "city": first['Rest_City'],
-                "postcode": first['Rest_Zip'],
-                "phone_number": first['Rest_Phone']
-            },
-            "customer": {
-                "name": first['Cust_Name'],
-                "address": first['Cust_Address'],
-                "city": first['Cust_City'],
-                "postcode": first['Cust_Zip'],
-                "phone_number": first['Cust_Phone']
-            },
-            "order_items": [] # Liste vide pour les articles
-        }
-        # 4. Boucle sur chaque ligne du groupe pour lister les articles
-        for _, row in group.iterrows():
-            order_obj["order_items"].append({
-                "name": row['Item_Name'],
-                "quantity": row['Item_Qty'],
-                "price": row['Item_Price']
-            })
-        # Ajoute la commande complète à la liste finale
-        json_output.append(order_obj)
-    # 5. Sauvegarde le résultat dans un fichier JSON propre et lisible
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(json_output, f, ensure_ascii=False, indent=4)
-    
-    return len(json_output)
+    # Sauvegarde le résultat dans un fichier JSON propre et lisible (écrit commande par commande)
+    with FluxCommandes(output_path, 'json') as flux:
+        for commande in construire_commandes(df):
+            flux.ecrire(commande)
+    return flux.n
+
+# %% [markdown]
+# Mode incrémental.
+# Un fichier dont la taille et la date de modification n'ont pas changé n'est ni relu ni analysé.
+# Si seule la date a changé, l'empreinte sha256 décide. Le manifeste est une base SQLite :
+# - table fichiers : nom, taille, date de modification et empreinte de chaque fichier
+# - table lignes : les lignes extraites, rangées par fichier, donc les sorties peuvent toujours être
+#   reconstruites sans rien ré-analyser
+# Une exécution ne lit que la table fichiers et n'écrit que les fichiers nouveaux, modifiés ou disparus.
+
+# %%
+def sha256_fichier(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloc in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+def ouvrir_manifeste(path):
+    # ordre = ordre d'ajout des fichiers (conservé quand un fichier modifié est ré-analysé)
+    con = sqlite3.connect(path)
+    colonnes = ', '.join(f'{c} TEXT' for c in COLONNES)
+    con.executescript(f"""
+        CREATE TABLE IF NOT EXISTS fichiers (
+            ordre INTEGER PRIMARY KEY AUTOINCREMENT,
+            nom TEXT NOT NULL UNIQUE,
+            taille INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS lignes (
+            ordre INTEGER NOT NULL,
+            pos INTEGER NOT NULL,
+            {colonnes},
+            PRIMARY KEY (ordre, pos)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS etat (cle TEXT PRIMARY KEY, valeur INTEGER NOT NULL);
+    """)
+    return con
+
+
+def exports_a_jour(con):
+    row = con.execute("SELECT valeur FROM etat WHERE cle = 'exports_a_jour'").fetchone()
+    return bool(row and row[0])
+
+
+def marquer_exports(con, a_jour):
+    # Sans commit : enregistré avec le reste de la transaction en cours
+    con.execute("INSERT OR REPLACE INTO etat (cle, valeur) VALUES ('exports_a_jour', ?)", (int(a_jour),))
+
+
+def mettre_a_jour_manifeste(con, dossier, fichiers, **kw_extraction):
+    # Analyse uniquement les fichiers nouveaux ou modifiés.
+    # Renvoie (lignes de chaque nouveau fichier, True si les sorties doivent être reconstruites)
+    connus = {nom: (taille, mtime_ns, empreinte)
+              for nom, taille, mtime_ns, empreinte in con.execute("SELECT nom, taille, mtime_ns, sha256 FROM fichiers")}
+    reconstruire = not exports_a_jour(con)
+    a_analyser = []
+    dates = []
+    for fichier in fichiers:
+        st = os.stat(os.path.join(dossier, fichier))
+        entree = connus.get(fichier)
+        if entree and entree[0] == st.st_size and entree[1] == st.st_mtime_ns:
+            continue
+        empreinte = sha256_fichier(os.path.join(dossier, fichier))
+        if entree and entree[2] == empreinte:
+            dates.append((st.st_size, st.st_mtime_ns, fichier))
+            continue
+        if entree:
+            # Contenu modifié : ses anciennes lignes sont déjà dans les sorties
+            reconstruire = True
+        a_analyser.append((fichier, st.st_size, st.st_mtime_ns, empreinte))
+
+    # Fichiers disparus de l'archive
+    presents = set(fichiers)
+    disparus = [(f,) for f in connus if f not in presents]
+    reconstruire = reconstruire or bool(disparus)
+
+    nouvelles = []
+    noms = [a[0] for a in a_analyser]
+    insertion = (f"INSERT INTO lignes (ordre, pos, {', '.join(COLONNES)}) "
+                 f"VALUES (?, ?, {', '.join('?' * len(COLONNES))})")
+    with con:
+        # Une seule transaction : une exécution interrompue ne laisse rien à moitié écrit
+        con.executemany("UPDATE fichiers SET taille = ?, mtime_ns = ? WHERE nom = ?", dates)
+        con.executemany("DELETE FROM lignes WHERE ordre = (SELECT ordre FROM fichiers WHERE nom = ?)", disparus)
+        con.executemany("DELETE FROM fichiers WHERE nom = ?", disparus)
+        for (fichier, taille, mtime_ns, empreinte), data in zip(a_analyser, extraire_dossier(dossier, noms, **kw_extraction)):
+            con.execute("INSERT INTO fichiers (nom, taille, mtime_ns, sha256) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (nom) DO UPDATE SET taille = excluded.taille, "
+                        "mtime_ns = excluded.mtime_ns, sha256 = excluded.sha256",
+                        (fichier, taille, mtime_ns, empreinte))
+            ordre = con.execute("SELECT ordre FROM fichiers WHERE nom = ?", (fichier,)).fetchone()[0]
+            con.execute("DELETE FROM lignes WHERE ordre = ?", (ordre,))
+            con.executemany(insertion, ((ordre, pos, *(row[c] for c in COLONNES)) for pos, row in enumerate(data)))
+            nouvelles.append(data)
+        if a_analyser or disparus:
+            # Tant que les sorties ne sont pas écrites, elles sont marquées comme périmées :
+            # une exécution interrompue les reconstruit à la suivante
+            marquer_exports(con, False)
+    print(f"{len(fichiers)} fichiers, {len(a_analyser)} analysés, {len(fichiers) - len(a_analyser)} inchangés")
+    return nouvelles, reconstruire
+
+
+def lignes_du_manifeste(con):
+    # Les lignes de chaque fichier, dans l'ordre où les fichiers ont été ajoutés
+    # (les fichiers sans article n'ont aucune ligne et ne sont pas renvoyés)
+    cur = con.execute(f"SELECT ordre, {', '.join(COLONNES)} FROM lignes ORDER BY ordre, pos")
+    for _, groupe in groupby(cur, key=lambda row: row[0]):
+        yield [dict(zip(COLONNES, row[1:])) for row in groupe]
+
+
+def fusionner_json(json_path, df_nouveau):
+    # Ajoute les nouvelles lignes au JSON existant, même résultat que generate_hierarchical_json sur tout
+    # (une commande déjà présente reçoit les nouveaux articles à la suite, tri par numéro de commande)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        commandes = json.load(f)
+    par_numero = {c['order']['order_number']: c for c in commandes}
+    for obj in construire_commandes(df_nouveau):
+        existante = par_numero.get(obj['order']['order_number'])
+        if existante:
+            existante['order_items'].extend(obj['order_items'])
+        else:
+            commandes.append(obj)
+            par_numero[obj['order']['order_number']] = obj
+    commandes.sort(key=lambda c: c['order']['order_number'])
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(commandes, f, ensure_ascii=False, indent=4)
+    return len(commandes)
+
+# %% [markdown]
+# Export Parquet.
+# Le CSV garde tout en texte et répète la commande sur chaque article. Ici, deux tables typées :
+# - deliveroo_commandes.parquet : une ligne par commande (date en datetime, montants en float,
+#   restaurant / client en colonnes catégorielles = encodage dictionnaire dans Parquet)
+# - deliveroo_articles.parquet : une ligne par article (quantité entière, prix en float), reliée par order_key
+# Lecture : pd.read_parquet('deliveroo_articles.parquet').merge(pd.read_parquet('deliveroo_commandes.parquet'), on='order_key')
+
+# %%
+FORMAT_DATE = "%a %d %b %Y %H %M %S"
+
+
+def prix_en_nombre(serie):
+    # "€22.69", "17,00 €", "1.234,50" -> float ; "Free" / "Gratuit" -> 0 ; illisible -> NaN
+    texte = serie.astype(str)
+    gratuit = texte.str.strip().str.lower().isin(['free', 'gratuit'])
+    chiffres = texte.str.replace(r'[^\d,.\-]', '', regex=True)
+    # le dernier séparateur suivi d'1 ou 2 chiffres est la virgule décimale, les autres sont des milliers
+    parties = chiffres.str.extract(r'^(-?[\d.,]*?)[.,](\d{1,2})$')
+    normalise = (parties[0].str.replace(r'[.,]', '', regex=True) + '.' + parties[1])
+    normalise = normalise.fillna(chiffres.str.replace(r'[.,]', '', regex=True))
+    valeurs = pd.to_numeric(normalise, errors='coerce').round(2)
+    valeurs[gratuit] = 0.0
+    return valeurs
+
+
+def tables_normalisees(df):
+    # df : lignes plates (colonnes COLONNES, en texte) -> (commandes, articles)
+    cle = df.groupby(['Date_File', 'Order_ID'], sort=False).ngroup().astype('int32')
+    premieres = ~cle.duplicated()
+    cmd = df[premieres]
+
+    def categorie(col):
+        return cmd[col].astype('category')
+
+    commandes = pd.DataFrame({
+        'order_key': cle[premieres],
+        'order_datetime': pd.to_datetime(cmd['Date_File'].str.strip(), format=FORMAT_DATE, errors='coerce'),
+        'order_number': cmd['Order_ID'],
+        'delivery_fee': prix_en_nombre(cmd['Delivery_Fee']),
+        'order_total_paid': prix_en_nombre(cmd['Total_Paid']),
+        'restaurant_name': categorie('Rest_Name'),
+        'restaurant_address': categorie('Rest_Address'),
+        'restaurant_city': categorie('Rest_City'),
+        'restaurant_postcode': categorie('Rest_Zip'),
+        'restaurant_phone': categorie('Rest_Phone'),
+        'customer_name': categorie('Cust_Name'),
+        'customer_address': categorie('Cust_Address'),
+        'customer_city': categorie('Cust_City'),
+        'customer_postcode': categorie('Cust_Zip'),
+        'customer_phone': categorie('Cust_Phone'),
+    }).reset_index(drop=True)
+    articles = pd.DataFrame({
+        'order_key': cle,
+        'quantity': pd.to_numeric(df['Item_Qty'], errors='coerce').astype('Int32'),
+        'name': df['Item_Name'].astype('category'),
+        'price': prix_en_nombre(df['Item_Price']),
+    }).reset_index(drop=True)
+    return commandes, articles
+
+
+def chemins_parquet(dossier):
+    return (os.path.join(dossier, 'deliveroo_commandes.parquet'), os.path.join(dossier, 'deliveroo_articles.parquet'))
+
+
+def exporter_parquet(df, dossier):
+    # pyarrow est optionnel : sans lui l'export est simplement ignoré
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow non installé, pas d'export Parquet")
+        return None
+    commandes, articles = tables_normalisees(df)
+    chemins = chemins_parquet(dossier)
+    commandes.to_parquet(chemins[0], index=False, compression='zstd')
+    articles.to_parquet(chemins[1], index=False, compression='zstd')
+    return chemins
 
 # %% [markdown]
 # 3. EXÉCUTION DES FONCTIONS
 
 # %%
-# Création du dossier de sortie
-if not os.path.exists(DOSSIER_HTML):
-    os.makedirs(DOSSIER_HTML)
-
-# Récupération des fichiers
-fichiers = [f for f in os.listdir(DOSSIER_HTML) if f.endswith('.html')]
-
-all_data = []
-
-# Boucle principale
-for fichier in fichiers:
-    
-    path = os.path.join(DOSSIER_HTML, fichier)
-    data = extract_data_from_html(path, fichier)
-    all_data.extend(data)
-
-# Création du DataFrame
-df = pd.DataFrame(all_data)
-
-# 1. Export CSV
-csv_path = os.path.join(DOSSIER_SORTIE, 'deliveroo_data_complet.csv')
-df.to_csv(csv_path, index=False, encoding='utf-8-sig')
-print(f"CSV sauvegardé : {csv_path}")
-
-# 2. Export JSON
-json_path = os.path.join(DOSSIER_SORTIE, 'deliveroo_structure_finale.json')
-nb_commandes = generate_hierarchical_json(df, json_path)
-print(f"JSON sauvegardé : {json_path}")
+# Protégé par __main__ : les processus de travail (spawn sous Windows) ré-importent ce fichier
+if __name__ == "__main__":
+    # Création du dossier de sortie
+    if not os.path.exists(DOSSIER_HTML):
+        os.makedirs(DOSSIER_HTML)
+
+    # Récupération des fichiers
+    fichiers = [f for f in os.listdir(DOSSIER_HTML) if f.endswith('.html')]
+
+    # lxml est optionnel : retour à html.parser s'il n'est pas installé
+    parseur = PARSEUR
+    if parseur == "lxml":
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            print("lxml non installé, utilisation de html.parser")
+            parseur = "html.parser"
+
+    profil = {}
+    kw_extraction = dict(n_processus=N_PROCESSUS, taille_lot=TAILLE_LOT, lots_en_cours=LOTS_EN_COURS,
+                         parser=parseur, tables_only=TABLES_SEULEMENT, profil=profil)
+    csv_path = os.path.join(DOSSIER_SORTIE, 'deliveroo_data_complet.csv')
+    json_path = os.path.join(DOSSIER_SORTIE, 'deliveroo_structure_finale.json')
+    flux_path = os.path.join(DOSSIER_SORTIE, f'deliveroo_commandes.{SORTIE_FLUX}') if SORTIE_FLUX else None
+    # Pour l'export Parquet : les lignes ont-elles changé, et toutes les lignes si elles sont déjà en mémoire
+    lignes_modifiees, df_plat = True, None
+
+    if INCREMENTAL:
+        manifeste = ouvrir_manifeste(MANIFESTE)
+        nouveaux, reconstruire = mettre_a_jour_manifeste(manifeste, DOSSIER_HTML, fichiers, **kw_extraction)
+        sorties = [csv_path, json_path] + ([flux_path] if flux_path else [])
+        reconstruire = reconstruire or not all(os.path.exists(p) for p in sorties)
+        if PROFIL:
+            afficher_profil(profil, len(fichiers))
+
+        if not reconstruire and not nouveaux:
+            print("Aucun changement, sorties déjà à jour")
+            lignes_modifiees = False
+        elif not reconstruire:
+            # Ajout des nouvelles lignes à la suite des sorties existantes
+            nouvelles = [row for data in nouveaux for row in data]
+            if nouvelles:
+                df = pd.DataFrame(nouvelles, columns=COLONNES)
+                df.to_csv(csv_path, mode='a', header=False, index=False, encoding='utf-8')
+                nb_commandes = fusionner_json(json_path, df)
+            if SORTIE_FLUX == 'jsonl':
+                with FluxCommandes(flux_path, 'jsonl', mode='a') as flux:
+                    for data in nouveaux:
+                        if data:
+                            flux.ecrire(commande_depuis_lignes(data))
+            elif SORTIE_FLUX and nouvelles:
+                with FluxCommandes(flux_path, SORTIE_FLUX) as flux:
+                    for data in lignes_du_manifeste(manifeste):
+                        flux.ecrire(commande_depuis_lignes(data))
+            print(f"{len(nouvelles)} articles ajoutés aux sorties")
+            lignes_modifiees = bool(nouvelles)
+        else:
+            # Reconstruction complète à partir des lignes du manifeste (rien n'est ré-analysé)
+            df = pd.DataFrame([row for data in lignes_du_manifeste(manifeste) for row in data], columns=COLONNES)
+            df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+            print(f"CSV sauvegardé : {csv_path}")
+            nb_commandes = generate_hierarchical_json(df, json_path)
+            print(f"JSON sauvegardé : {json_path}")
+            df_plat = df
+            if SORTIE_FLUX:
+                with FluxCommandes(flux_path, SORTIE_FLUX) as flux:
+                    for data in lignes_du_manifeste(manifeste):
+                        flux.ecrire(commande_depuis_lignes(data))
+                print(f"{SORTIE_FLUX.upper()} sauvegardé : {flux_path}")
+
+        if reconstruire or nouveaux:
+            with manifeste:
+                marquer_exports(manifeste, True)
+        manifeste.close()
+
+    elif SORTIE_FLUX:
+        # Export en flux : chaque fichier est écrit dès qu'il est analysé (CSV + une commande)
+        n_articles = 0
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f_csv, \
+                FluxCommandes(flux_path, SORTIE_FLUX) as flux:
+            ecrivain = csv.writer(f_csv, lineterminator=os.linesep)
+            ecrivain.writerow(COLONNES)
+            for data in extraire_dossier(DOSSIER_HTML, fichiers, **kw_extraction):
+                ecrivain.writerows([row[c] for c in COLONNES] for row in data)
+                if data:
+                    flux.ecrire(commande_depuis_lignes(data))
+                n_articles += len(data)
+        print(f"{len(fichiers)} fichiers lus, {n_articles} articles")
+        if PROFIL:
+            afficher_profil(profil, len(fichiers))
+        print(f"CSV sauvegardé : {csv_path}")
+        print(f"{SORTIE_FLUX.upper()} sauvegardé : {flux_path}")
+
+    else:
+        # Boucle principale (répartie sur N_PROCESSUS processus)
+        all_data = []
+        for data in extraire_dossier(DOSSIER_HTML, fichiers, **kw_extraction):
+            all_data.extend(data)
+        print(f"{len(fichiers)} fichiers lus, {len(all_data)} articles")
+        if PROFIL:
+            afficher_profil(profil, len(fichiers))
+
+        # Création du DataFrame
+        df = pd.DataFrame(all_data, columns=COLONNES)
+        df_plat = df
+
+        # 1. Export CSV
+        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        print(f"CSV sauvegardé : {csv_path}")
+
+        # 2. Export JSON
+        nb_commandes = generate_hierarchical_json(df, json_path)
+        print(f"JSON sauvegardé : {json_path}")
+
+    # 3. Export Parquet, seulement si des lignes ont changé (ou si les fichiers n'existent pas encore)
+    if SORTIE_PARQUET:
+        if SORTIE_FLUX and not INCREMENTAL:
+            print("Export Parquet ignoré en mode flux : il chargerait toute l'archive en mémoire")
+        elif not lignes_modifiees and all(os.path.exists(p) for p in chemins_parquet(DOSSIER_SORTIE)):
+            print("Parquet déjà à jour")
+        else:
+            if df_plat is None:
+                # Lignes ajoutées à la suite du CSV : relu en entier (à jour)
+                df_plat = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+            chemins = exporter_parquet(df_plat, DOSSIER_SORTIE)
+            if chemins:
+                print(f"Parquet sauvegardé : {chemins[0]}, {chemins[1]}")
@@ -0,0 +1,118 @@
+"""
+bench_ngrams.py
+
+Word vs character n-gram analyzers: recall on misspelled queries and latency.
+
+Recall: queries are catalogue items with typos injected (swap / drop /
+insert / replace a letter), recall@k = share of queries whose source item
+comes back in the top k. With --csv, the assignment queries are also run
+and the top match of every mode is printed side by side.
+
+    python bench_ngrams.py --size 20000 --queries 1000
+    python bench_ngrams.py --csv C:\\information_retrieval\\tf_idf.csv
+"""
+
+import argparse
+import random
+import time
+
+from bench_tfidf import synthetic_corpus
+from tfidf_index import Analyzer, TfidfIndex
+
+
+# queries from the assignment (typos included)
+ASSIGNMENT_QUERIES = [
+    "panatalon noir",
+    "balai essuie glaces avant",
+    "fromage fondu kiri",
+    "lentilles 265g",
+    "croutons à l'ail tipiak",
+    "mozarella bille 150g",
+    "sac a bandouillere en nylon",
+    "mais doux saint eloi",
+    "croustibat findus",
+    "pipe rigate carrefour"
+]
+
+ANALYZERS = {
+    'word': Analyzer('word'),
+    'char3': Analyzer('char', ngram=3, n_features=2**20),
+    'char4': Analyzer('char', ngram=4, n_features=2**20),
+}
+
+
+def add_typo(word, rng):
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    op = rng.choice('sdir')
+    if op == 's':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if op == 'd':
+        return word[:i] + word[i + 1:]
+    c = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    if op == 'i':
+        return word[:i] + c + word[i:]
+    return word[:i] + c + word[i + 1:]
+
+
+def typo_queries(data, n, seed=2):
+    """(query, source doc id) pairs, one typo in every long enough word."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        i = rng.randrange(len(data))
+        out.append((' '.join(add_typo(w, rng) for w in data[i].split()), i))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--csv', help='catalogue csv (first column); default = synthetic data')
+    ap.add_argument('--size', type=int, default=20000)
+    ap.add_argument('--queries', type=int, default=1000)
+    ap.add_argument('--k', type=int, default=5)
+    args = ap.parse_args()
+
+    if args.csv:
+        import pandas as pd
+        col = pd.read_csv(args.csv).iloc[:, 0]
+        data = [str(x) for x in col if pd.notna(x) and str(x).strip() != ''][:args.size]
+    else:
+        data = synthetic_corpus(args.size)
+    pairs = typo_queries(data, args.queries)
+    queries = [q for q, _ in pairs]
+
+    indexes = {}
+    print(f"{'mode':>6} {'build s':>8} {'recall@1':>9} {f'recall@{args.k}':>9} {'ms/query':>9} {'batch q/s':>10}")
+    for name, analyzer in ANALYZERS.items():
+        t0 = time.perf_counter()
+        index = TfidfIndex(data, analyzer=analyzer)
+        build = time.perf_counter() - t0
+        indexes[name] = index
+
+        t0 = time.perf_counter()
+        for q in queries[:200]:
+            index.search(q, k=args.k)
+        per_query = (time.perf_counter() - t0) / min(200, len(queries)) * 1000
+
+        t0 = time.perf_counter()
+        hits = index.search_batch(queries, k=args.k)
+        qps = len(queries) / (time.perf_counter() - t0)
+
+        # a duplicate of the source item is as good as the item itself
+        r1 = sum(data[top[0][0]] == data[src] for top, (_, src) in zip(hits, pairs) if top)
+        rk = sum(any(data[d] == data[src] for d, _ in top) for top, (_, src) in zip(hits, pairs))
+        print(f"{name:>6} {build:>8.2f} {r1 / len(pairs):>9.3f} {rk / len(pairs):>9.3f} {per_query:>9.3f} {qps:>10.1f}")
+
+    if args.csv:
+        print("\nassignment queries (top match per mode):")
+        for q in ASSIGNMENT_QUERIES:
+            print(f"- {q}")
+            for name, index in indexes.items():
+                doc_id, score = index.search(q, k=1)[0]
+                print(f"    {name:>6} {score:.2f}  {index.get(doc_id)[:60]}")
+
+
+if __name__ == '__main__':
+    main()
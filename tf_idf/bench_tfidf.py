@@ -0,0 +1,169 @@
+"""
+bench_tfidf.py
+
+Throughput benchmark for TF-IDF matching.
+
+Compares, for several corpus sizes:
+- loop   : the original script (dense matrix + calc_sim over every row, one query at a time)
+- search : TfidfIndex.search, one query at a time
+- batch  : TfidfIndex.search_batch, all queries at once
+
+Each (method, size) runs in a fresh process so the peak RSS is its own.
+
+    python bench_tfidf.py --sizes 1000 10000 100000 --queries 2000
+    python bench_tfidf.py --csv C:\\information_retrieval\\tf_idf.csv
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from tfidf_index import TfidfIndex, get_tokens
+
+
+# dense matrix gets too big past this size, skip the legacy loop
+LOOP_MAX_CELLS = 2 * 10**8
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None if unknown)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # linux reports KB, macOS reports bytes
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 2**20
+    except ImportError:
+        return None
+
+
+def synthetic_corpus(n, seed=0):
+    """Product-like strings built from a zipf-ish vocabulary."""
+    rng = random.Random(seed)
+    n_words = max(1000, n // 2)
+    words = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(3, 9))) for _ in range(n_words)]
+    weights = [1.0 / (i + 1) for i in range(n_words)]
+    return [' '.join(rng.choices(words, weights=weights, k=rng.randint(2, 8))) for _ in range(n)]
+
+
+def make_queries(data, n, seed=1):
+    """Queries = random catalogue items with one word dropped."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        toks = rng.choice(data).split()
+        if len(toks) > 1:
+            toks.pop(rng.randrange(len(toks)))
+        out.append(' '.join(toks))
+    return out
+
+
+def run_loop(data, queries, k):
+    # the original assignment code path
+    all_tokens = [get_tokens(x) for x in data]
+    vocab = sorted(set(w for t in all_tokens for w in t))
+    w2i = {w: i for i, w in enumerate(vocab)}
+    counts = Counter()
+    for t in all_tokens:
+        counts.update(set(t))
+    idf = {w: np.log(len(data) / (c + 1)) for w, c in counts.items()}
+
+    def make_vec(tokens):
+        vec = np.zeros(len(vocab))
+        for w, c in Counter(tokens).items():
+            if w in w2i:
+                vec[w2i[w]] = c * idf.get(w, 0)
+        return vec
+
+    def calc_sim(v1, v2):
+        n1, n2 = np.linalg.norm(v1), np.linalg.norm(v2)
+        return 0.0 if n1 == 0 or n2 == 0 else np.dot(v1, v2) / (n1 * n2)
+
+    matrix = np.array([make_vec(t) for t in all_tokens])
+    t0 = time.perf_counter()
+    for q in queries:
+        q_vec = make_vec(get_tokens(q))  # once per query, as in the original script
+        sims = [calc_sim(q_vec, d) for d in matrix]
+        np.argmax(sims)
+    return time.perf_counter() - t0
+
+
+def run_search(data, queries, k):
+    index = TfidfIndex(data)
+    t0 = time.perf_counter()
+    for q in queries:
+        index.search(q, k=k)
+    return time.perf_counter() - t0
+
+
+def run_batch(data, queries, k):
+    index = TfidfIndex(data)
+    t0 = time.perf_counter()
+    index.search_batch(queries, k=k)
+    return time.perf_counter() - t0
+
+
+METHODS = {'loop': run_loop, 'search': run_search, 'batch': run_batch}
+
+
+def worker(method, data, queries, k, out):
+    secs = METHODS[method](data, queries, k)
+    out.put((secs, peak_rss_mb()))
+
+
+def measure(method, data, queries, k):
+    """Run one method in a child process, return (seconds, peak RSS MB)."""
+    ctx = mp.get_context('spawn')
+    out = ctx.Queue()
+    p = ctx.Process(target=worker, args=(method, data, queries, k, out))
+    p.start()
+    res = out.get()
+    p.join()
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--csv', help='catalogue csv (first column); default = synthetic data')
+    ap.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    ap.add_argument('--queries', type=int, default=1000)
+    ap.add_argument('--loop-queries', type=int, default=20, help='queries for the (slow) legacy loop')
+    ap.add_argument('--k', type=int, default=10)
+    ap.add_argument('--methods', nargs='+', default=list(METHODS), choices=list(METHODS))
+    args = ap.parse_args()
+
+    if args.csv:
+        import pandas as pd
+        col = pd.read_csv(args.csv).iloc[:, 0]
+        full = [str(x) for x in col if pd.notna(x) and str(x).strip() != '']
+    else:
+        full = synthetic_corpus(max(args.sizes))
+
+    print(f"{'size':>8} {'method':>7} {'queries':>8} {'q/s':>10} {'peak MB':>9}")
+    for n in args.sizes:
+        data = full[:n]
+        for method in args.methods:
+            n_q = args.loop_queries if method == 'loop' else args.queries
+            queries = make_queries(data, n_q)
+            if method == 'loop':
+                n_vocab = len(set(w for d in data for w in get_tokens(d)))
+                if len(data) * n_vocab > LOOP_MAX_CELLS:
+                    print(f"{n:>8} {method:>7} {'-':>8} {'skipped (dense matrix too big)':>20}")
+                    continue
+            secs, peak = measure(method, data, queries, args.k)
+            peak_s = f"{peak:9.1f}" if peak is not None else f"{'n/a':>9}"
+            print(f"{n:>8} {method:>7} {n_q:>8} {n_q / secs:>10.1f} {peak_s}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,61 +1,40 @@
+import os
+
 import pandas as pd
-import numpy as np
-import re
-from collections import Counter
 
-# clean the text
-def get_tokens(text):
-    return re.findall(r'\w+', str(text).lower())
+from tfidf_index import Analyzer, TfidfIndex, source_stamp
 
-# math stuff for similarity
-def calc_sim(v1, v2):
-    n1 = np.linalg.norm(v1)
-    n2 = np.linalg.norm(v2)
-    
-    if n1 == 0 or n2 == 0:
-        return 0.0
-    
-    return np.dot(v1, v2) / (n1 * n2)
+# 'word' = assignment tokens, 'char' = hashed 3-grams (typo tolerant)
+mode = 'word'
+analyzer = Analyzer('char', ngram=3, n_features=2**20) if mode == 'char' else Analyzer('word')
 
-# load data
-print("loading data...")
 path = r'C:\information_retrieval\tf_idf.csv' # hope this path is right
-df = pd.read_csv(path)
-data = df.iloc[:, 0].tolist()
-
-# remove nan values
-data = [str(x) for x in data if pd.notna(x) and str(x).strip() != '']
-print(f"loaded {len(data)} items")
-
-# tokenize everything
-all_tokens = [get_tokens(x) for x in data]
 
-# vocab list
-vocab = sorted(list(set(w for t in all_tokens for w in t)))
-w2i = {w: i for i, w in enumerate(vocab)}
-N = len(data)
+# saved index from a previous run (see tfidf_index.py build)
+index_dir = rf'C:\information_retrieval\tfidf_index_{mode}'
 
-# calc IDF
-print("calculating idf...")
-counts = Counter()
-for t in all_tokens:
-    counts.update(set(t))
+# reused only if built from this exact csv with the same analyzer settings
+if TfidfIndex.is_current(index_dir, source_stamp(path), analyzer):
+    # memory-mapped, no csv / tokenizing / matrix work needed
+    print("loading index...")
+    index = TfidfIndex.load(index_dir)
+else:
+    if os.path.exists(os.path.join(index_dir, 'meta.json')):
+        print("saved index is out of date, rebuilding")
+    # load data
+    print("loading data...")
+    df = pd.read_csv(path)
+    data = df.iloc[:, 0].tolist()
 
-idf = {w: np.log(N / (c + 1)) for w, c in counts.items()}
+    # remove nan values
+    data = [str(x) for x in data if pd.notna(x) and str(x).strip() != '']
+    print(f"loaded {len(data)} items")
 
-# helper to get vector
-def make_vec(tokens):
-    vec = np.zeros(len(vocab))
-    tf = Counter(tokens)
-    
-    for w, c in tf.items():
-        if w in w2i:
-            vec[w2i[w]] = c * idf.get(w, 0)
-    return vec
-
-# make the big matrix
-print("building matrix...")
-matrix = np.array([make_vec(t) for t in all_tokens])
+    # build the sparse index (vocab, idf and normalized matrix)
+    print("building index...")
+    index = TfidfIndex(data, analyzer=analyzer)
+    index.source = source_stamp(path)
+    index.save(index_dir)
 
 # search list from assignment
 queries = [
@@ -74,16 +53,12 @@ queries = [
 res = []
 
 print("searching...")
-for q in queries:
-    q_toks = get_tokens(q)
-    q_vec = make_vec(q_toks)
-    
-    # compare with everything
-    sims = [calc_sim(q_vec, d_vec) for d_vec in matrix]
-    
-    best = np.argmax(sims)
-    score = sims[best]
-    match = data[best]
+# all queries scored together (one matmul per chunk)
+hits = index.search_batch(queries, k=1)
+
+for q, top in zip(queries, hits):
+    best, score = top[0]
+    match = index.get(best)
     
     res.append({
         "query": q,
@@ -0,0 +1,659 @@
+"""
+tfidf_index.py
+
+Sparse TF-IDF search index.
+
+- documents are stored as a CSR matrix (N x |vocab|) with L2-normalized rows
+- the transpose is kept as an inverted index: row t = postings of term t
+- a query only touches the postings of its own terms
+- many queries are scored at once with one sparse matmul per chunk
+- the index can be saved as plain .npy files and reopened memory-mapped
+- documents can be added / deleted without a full rebuild
+- terms are words or (hashed) character n-grams for typo-tolerant matching
+
+Build once, then query from any number of processes:
+
+    python tfidf_index.py build C:\\information_retrieval\\tf_idf.csv tfidf_index_dir [word|char]
+    index = TfidfIndex.load('tfidf_index_dir')
+"""
+
+import json
+import mmap
+import os
+import shutil
+import sys
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'common'))
+from tokenizer import tokenize
+
+
+FORMAT_VERSION = 2
+
+# same tokenizer as the assignment script (shared, cached)
+get_tokens = tokenize
+
+
+class Analyzer:
+    """
+    Turns a text into index terms.
+
+    mode='word' : \\w+ tokens (the assignment tokenizer)
+    mode='char' : character n-grams of every word, padded with a space on
+                  both sides so prefixes / suffixes get their own grams
+                  ("kiri" -> " ki", "kir", "iri", "ri ")
+
+    With n_features set, terms are hashed (crc32) into that many buckets:
+    no vocabulary is stored and memory stays bounded whatever the corpus.
+    """
+
+    def __init__(self, mode='word', ngram=3, n_features=None):
+        if mode not in ('word', 'char'):
+            raise ValueError(f"unknown analyzer mode {mode!r}")
+        self.mode = mode
+        self.ngram = ngram
+        self.n_features = n_features
+
+    @property
+    def hashed(self):
+        return self.n_features is not None
+
+    def config(self):
+        return {'mode': self.mode, 'ngram': self.ngram, 'n_features': self.n_features}
+
+    def terms(self, text):
+        return self.terms_from_tokens(get_tokens(text))
+
+    def terms_from_tokens(self, toks):
+        """Same as terms() for an already tokenized text."""
+        if self.mode == 'char':
+            n = self.ngram
+            grams = []
+            for w in toks:
+                p = f' {w} '
+                grams.extend(p[i:i + n] for i in range(max(1, len(p) - n + 1)))
+            toks = grams
+        if self.hashed:
+            # crc32 is stable across runs (hash() is salted per process)
+            return [zlib.crc32(t.encode('utf-8')) % self.n_features for t in toks]
+        return toks
+
+
+def top_k(scores, k):
+    """Indices of the k best scores, best first (argpartition, no full sort)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k == 1:
+        # same tie-break as np.argmax (lowest index wins)
+        return np.array([np.argmax(scores)])
+    if k < len(scores):
+        idx = np.sort(np.argpartition(-scores, k - 1)[:k])
+    else:
+        idx = np.arange(len(scores))
+    return idx[np.argsort(-scores[idx], kind='stable')]
+
+
+def _index_dtype(n):
+    return np.int32 if n < 2**31 else np.int64
+
+
+class DocStore:
+    """
+    Read-only list of documents backed by one utf-8 blob + offsets.
+
+    Strings are decoded on access, so opening it costs nothing.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def write(cls, docs, path):
+        offsets = [0]
+        with open(os.path.join(path, 'docs.bin'), 'wb') as f:
+            for d in docs:
+                b = d.encode('utf-8')
+                f.write(b)
+                offsets.append(offsets[-1] + len(b))
+        np.save(os.path.join(path, 'doc_offsets.npy'), np.asarray(offsets, dtype=np.int64))
+
+    @classmethod
+    def open(cls, path, mmap_mode='r'):
+        offsets = np.load(os.path.join(path, 'doc_offsets.npy'), mmap_mode=mmap_mode)
+        blob_path = os.path.join(path, 'docs.bin')
+        if os.path.getsize(blob_path) == 0:
+            blob = b''
+        elif mmap_mode:
+            blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+        else:
+            with open(blob_path, 'rb') as f:
+                blob = f.read()
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class TfidfIndex:
+    """
+    TF-IDF index with cosine similarity search.
+
+    Weights are the same as the assignment script:
+    tf = raw count, idf = log(N / (df + 1)).
+
+    Documents can be added and deleted after the build. Every document
+    keeps a stable id (its position in the first batch, then increasing).
+    An update only touches the new / deleted rows: document frequencies
+    are kept as counts and idf + the normalized matrix are re-derived
+    lazily by the next query. Deleted rows are tombstoned and dropped by
+    compact(), which runs in a background thread once more than
+    compact_ratio of the rows are dead.
+    """
+
+    def __init__(self, docs=(), compact_ratio=0.2, analyzer=None):
+        self.compact_ratio = compact_ratio
+        self.analyzer = analyzer or Analyzer()
+        self.source = None  # source_stamp() of the file the docs came from, kept in meta.json
+        self.docs = []
+        self.vocab = []
+        self.w2i = {}
+        self.n_alive = 0
+        self._n_rows = 0
+        self._next_id = 0
+        self._df = np.zeros(0, dtype=np.int64)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._alive = np.zeros(0, dtype=bool)
+        self.tf = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._blocks = []  # tf rows added since the last refresh
+        self._dirty = True
+        self._lock = threading.RLock()
+        self._compactor = None
+        self.add_documents(docs)
+        self._refresh()
+
+    def __len__(self):
+        return self.n_alive
+
+    @property
+    def n_terms(self):
+        if self.analyzer.hashed:
+            return self.analyzer.n_features
+        return len(self.vocab)
+
+    @property
+    def df(self):
+        return self._df[:self.n_terms]
+
+    @property
+    def ids(self):
+        return self._ids[:self._n_rows]
+
+    @property
+    def alive(self):
+        return self._alive[:self._n_rows]
+
+    def _count_rows(self, docs, tokens=None):
+        # term counts per doc, new words get the next term id
+        indptr = [0]
+        indices = []
+        data = []
+        if tokens is None:
+            all_terms = map(self.analyzer.terms, docs)
+        else:
+            all_terms = map(self.analyzer.terms_from_tokens, tokens)
+        for terms in all_terms:
+            for w, c in Counter(terms).items():
+                # hashed terms are already ids
+                i = w if self.analyzer.hashed else self.w2i.get(w)
+                if i is None:
+                    i = self.w2i[w] = self.n_terms
+                    self.vocab.append(w)
+                indices.append(i)
+                data.append(c)
+            indptr.append(len(indices))
+        block = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.int32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(docs), self.n_terms),
+        )
+        block.sort_indices()
+        return block
+
+    def _make_writable(self):
+        # a loaded index is read-only (memory-mapped), copy on first update
+        if isinstance(self.docs, list):
+            return
+        self.docs = list(self.docs)
+        self.vocab = list(self.vocab)
+        self._df = np.array(self._df)
+        self._ids = np.array(self._ids)
+        self._alive = np.array(self._alive)
+
+    def add_documents(self, docs, tokens=None):
+        """
+        Append documents and return their ids (cost ~ size of the new docs).
+
+        tokens: the docs already tokenized (e.g. TokenCorpus.token_lists()),
+        skips the tokenizer.
+        """
+        docs = [str(d) for d in docs]
+        if tokens is not None and len(tokens) != len(docs):
+            raise ValueError(f"docs and tokens differ in length ({len(docs)} != {len(tokens)})")
+        with self._lock:
+            self._make_writable()
+            block = self._count_rows(docs, tokens)
+            n_new, n_rows = len(docs), self._n_rows + len(docs)
+
+            self._df = _grow(self._df, self.n_terms)
+            np.add.at(self._df, block.indices, 1)
+
+            new_ids = np.arange(self._next_id, self._next_id + n_new, dtype=np.int64)
+            self._ids = _grow(self._ids, n_rows)
+            self._ids[self._n_rows:n_rows] = new_ids
+            self._alive = _grow(self._alive, n_rows)
+            self._alive[self._n_rows:n_rows] = True
+
+            self.docs.extend(docs)
+            self._blocks.append(block)
+            self._n_rows = n_rows
+            self._next_id += n_new
+            self.n_alive += n_new
+            self._dirty = True
+        return new_ids.tolist()
+
+    def delete_documents(self, doc_ids):
+        """Tombstone documents by id (cost ~ number of deleted docs)."""
+        with self._lock:
+            self._make_writable()
+            rows = self._rows_of(doc_ids)
+            rows = np.unique(rows[self._alive[rows]])
+            if len(rows) == 0:
+                return
+            terms = np.concatenate([self._row_terms(r) for r in rows])
+            np.subtract.at(self._df, terms, 1)
+            self._alive[rows] = False
+            self.n_alive -= len(rows)
+            self._dirty = True
+
+            if self._n_rows - self.n_alive > self.compact_ratio * self._n_rows:
+                self.compact(background=True)
+
+    def get(self, doc_id):
+        """Text of a live document."""
+        with self._lock:
+            row = self._rows_of([doc_id])[0]
+            if not self._alive[row]:
+                raise KeyError(doc_id)
+            return self.docs[row]
+
+    def _rows_of(self, doc_ids):
+        # ids only ever grow and compaction keeps the order, so they are sorted
+        doc_ids = np.asarray(doc_ids, dtype=np.int64).ravel()
+        ids = self.ids
+        rows = np.searchsorted(ids, doc_ids)
+        found = rows < len(ids)
+        found[found] = ids[rows[found]] == doc_ids[found]
+        bad = ~found
+        if bad.any():
+            raise KeyError(doc_ids[bad][0].item())
+        return rows
+
+    def _row_terms(self, row):
+        m = self.tf
+        for block in self._blocks:
+            if row < m.shape[0]:
+                break
+            row -= m.shape[0]
+            m = block
+        return m.indices[m.indptr[row]:m.indptr[row + 1]]
+
+    def _merge_blocks(self):
+        if not self._blocks:
+            return
+        n_terms = self.n_terms
+        parts = [_with_width(m, n_terms) for m in [self.tf] + self._blocks]
+        self.tf = sparse.vstack(parts, format='csr')
+        self._blocks = []
+
+    def _refresh(self):
+        # re-derive idf and the normalized matrix after updates
+        with self._lock:
+            if not self._dirty:
+                return
+            self._merge_blocks()
+            tf = _with_width(self.tf, self.n_terms)
+            n_rows, n_terms = tf.shape
+            df = self.df
+            self.idf = np.log(self.n_alive / (df + 1.0)) if self.n_alive else np.zeros(n_terms)
+
+            # tf-idf weights (0 for deleted rows), then L2-normalize every row
+            rows = np.repeat(np.arange(n_rows), np.diff(tf.indptr))
+            w = tf.data * self.idf[tf.indices] * self.alive[rows]
+            norms = np.sqrt(np.bincount(rows, weights=w * w, minlength=n_rows))
+            safe = np.where(norms > 0, norms, 1.0)
+            w = w / safe[rows]
+
+            self.tf = tf
+            self.matrix = sparse.csr_matrix((w, tf.indices, tf.indptr), shape=(n_rows, n_terms))
+            postings = self.matrix.T.tocsr()
+            postings.eliminate_zeros()
+            self.postings = postings
+            self._dirty = False
+
+    def compact(self, background=False):
+        """Drop deleted rows for good. background=True runs it in a thread."""
+        if not background:
+            self._compact()
+            return None
+        with self._lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(target=self._compact, daemon=True)
+                self._compactor.start()
+            return self._compactor
+
+    def _compact(self):
+        with self._lock:
+            self._make_writable()
+            self._merge_blocks()
+            tf, docs, n = self.tf, self.docs, self._n_rows
+            keep = np.flatnonzero(self.alive)
+            ids = self.ids[keep]
+        if len(keep) == n:
+            return
+
+        # the expensive part runs without the lock, queries keep working
+        new_tf = tf[keep]
+        new_docs = [docs[i] for i in keep]
+
+        with self._lock:
+            # rows added (or deleted) while we were busy are carried over
+            n_terms = self.n_terms
+            tail = [_with_width(self.tf[n:], n_terms)] if self.tf.shape[0] > n else []
+            self.tf = sparse.vstack([_with_width(new_tf, n_terms)] + tail, format='csr')
+            self.docs = new_docs + self.docs[n:]
+            self._ids = np.concatenate([ids, self.ids[n:]])
+            self._alive = np.concatenate([self.alive[:n][keep], self.alive[n:]])
+            self._n_rows = len(self._ids)
+            self._dirty = True
+
+    def save(self, path):
+        """
+        Write the index to a directory of .npy files (+ vocab and docs).
+
+        The files are written to a sibling directory and swapped in at the
+        end, so an index loaded (memory-mapped) from path can be saved back
+        there: np.save never truncates a file it is still reading from.
+        The memory-mapped arrays are copied into memory before the swap.
+        """
+        path = os.path.abspath(path)
+        tmp = f'{path}.tmp-{os.getpid()}'
+        old = f'{path}.old-{os.getpid()}'
+        for leftover in (tmp, old):
+            if os.path.exists(leftover):
+                shutil.rmtree(leftover)
+        with self._lock:
+            self._refresh()
+            self._write(tmp)
+            if os.path.exists(path):
+                # Windows cannot move or delete files that are still mapped
+                self._release_maps()
+                # a directory cannot be replaced while non-empty: move it aside first
+                os.replace(path, old)
+            os.replace(tmp, path)
+        if os.path.exists(old):
+            shutil.rmtree(old)
+
+    def _release_maps(self):
+        # copy whatever is still memory-mapped, the files can then be moved
+        self._make_writable()
+        self.idf = _unmapped(self.idf)
+        shared = np.may_share_memory(self.tf.indices, self.matrix.indices)  # true for a loaded index
+        for name in ('matrix', 'postings', 'tf'):
+            m = getattr(self, name)
+            if shared and name == 'tf':
+                indices, indptr = self.matrix.indices, self.matrix.indptr
+            else:
+                indices, indptr = _unmapped(m.indices), _unmapped(m.indptr)
+            setattr(self, name, sparse.csr_matrix((_unmapped(m.data), indices, indptr), shape=m.shape))
+
+    def _write(self, path):
+        os.makedirs(path)
+        # tf shares the matrix sparsity pattern, only its data is saved
+        for name, m in (('matrix', self.matrix), ('postings', self.postings)):
+            idx_dtype = _index_dtype(max(m.nnz, max(m.shape)))
+            np.save(os.path.join(path, f'{name}_data.npy'), m.data)
+            np.save(os.path.join(path, f'{name}_indices.npy'), m.indices.astype(idx_dtype, copy=False))
+            np.save(os.path.join(path, f'{name}_indptr.npy'), m.indptr.astype(idx_dtype, copy=False))
+        np.save(os.path.join(path, 'tf_data.npy'), self.tf.data)
+        np.save(os.path.join(path, 'idf.npy'), self.idf)
+        np.save(os.path.join(path, 'df.npy'), self.df)
+        np.save(os.path.join(path, 'ids.npy'), self.ids)
+        np.save(os.path.join(path, 'alive.npy'), self.alive)
+
+        # terms never contain a newline (empty file when hashed)
+        with open(os.path.join(path, 'vocab.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.vocab))
+        DocStore.write(self.docs, path)
+
+        # meta last: a directory without it is an unfinished build
+        meta = {
+            'version': FORMAT_VERSION,
+            'n_rows': self._n_rows,
+            'n_alive': self.n_alive,
+            'n_terms': self.n_terms,
+            'next_id': self._next_id,
+            'analyzer': self.analyzer.config(),
+            'source': self.source,
+        }
+        with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    @staticmethod
+    def is_current(path, source=None, analyzer=None):
+        """
+        True if path holds a saved index built from source (a source_stamp)
+        with the same analyzer settings, i.e. it can be loaded instead of
+        rebuilt.
+        """
+        try:
+            with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get('version') != FORMAT_VERSION:
+            return False
+        if source is not None and meta.get('source') != source:
+            return False
+        return analyzer is None or meta.get('analyzer') == analyzer.config()
+
+    @classmethod
+    def load(cls, path, mmap_mode='r', compact_ratio=0.2):
+        """
+        Open an index written by save().
+
+        With mmap_mode='r' nothing is copied into memory: the arrays are
+        paged in on demand and shared between processes by the OS. The
+        first update copies what it needs to modify.
+        """
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"unsupported index format {meta.get('version')} in {path}")
+        n_rows, n_terms = meta['n_rows'], meta['n_terms']
+        analyzer = Analyzer(**meta.get('analyzer', {}))
+
+        def arr(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+
+        self = cls.__new__(cls)
+        self.compact_ratio = compact_ratio
+        self.analyzer = analyzer
+        self.source = meta.get('source')
+        self.docs = DocStore.open(path, mmap_mode=mmap_mode)
+        with open(os.path.join(path, 'vocab.txt'), encoding='utf-8') as f:
+            self.vocab = f.read().split('\n') if n_terms and not analyzer.hashed else []
+        self.w2i = {w: i for i, w in enumerate(self.vocab)}
+        self.n_alive = meta['n_alive']
+        self._n_rows = n_rows
+        self._next_id = meta['next_id']
+        self._df = arr('df')
+        self._ids = arr('ids')
+        self._alive = arr('alive')
+        self.idf = arr('idf')
+        indices, indptr = arr('matrix_indices'), arr('matrix_indptr')
+        self.tf = sparse.csr_matrix((arr('tf_data'), indices, indptr), shape=(n_rows, n_terms))
+        self.matrix = sparse.csr_matrix((arr('matrix_data'), indices, indptr), shape=(n_rows, n_terms))
+        self.postings = sparse.csr_matrix(
+            (arr('postings_data'), arr('postings_indices'), arr('postings_indptr')), shape=(n_terms, n_rows))
+        self._blocks = []
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._compactor = None
+        return self
+
+    def query_matrix(self, texts):
+        """Normalized sparse query matrix (len(texts) x |vocab|)."""
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            terms, w = self.query_vector(text)
+            indices.extend(terms)
+            data.extend(w)
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(texts), self.n_terms),
+        )
+
+    def query_vector(self, text):
+        """Normalized sparse (terms, weights) for a query; unknown words are dropped."""
+        if self.analyzer.hashed:
+            tf = Counter(self.analyzer.terms(text))
+            terms = np.fromiter(tf, dtype=np.int32, count=len(tf))
+        else:
+            tf = Counter(w for w in self.analyzer.terms(text) if w in self.w2i)
+            terms = np.fromiter((self.w2i[w] for w in tf), dtype=np.int32, count=len(tf))
+        w = np.fromiter(tf.values(), dtype=np.float64, count=len(tf))
+        # words left only in deleted docs count as unknown
+        known = self.df[terms] > 0
+        terms, w = terms[known], w[known] * self.idf[terms[known]]
+        norm = np.sqrt(w @ w)
+        if norm == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        return terms, w / norm
+
+    def search(self, text, k=1):
+        """Top-k (doc_id, score) pairs for a query, best first."""
+        return self.search_batch([text], k=k)[0]
+
+    def search_batch(self, texts, k=1, chunk_size=256):
+        """
+        Top-k (doc_id, score) pairs for every query in texts.
+
+        Queries are scored chunk_size at a time with one sparse matmul, so
+        only the documents sharing a term with a query are ever materialized.
+        """
+        texts = list(texts)
+        with self._lock:
+            # inside the lock: a background compaction cannot slip in between
+            self._refresh()
+            postings, ids, alive = self.postings, self.ids, self.alive
+            k = min(k, self.n_alive)
+            out = []
+            if k <= 0:
+                return [[] for _ in texts]
+            for start in range(0, len(texts), chunk_size):
+                q = self.query_matrix(texts[start:start + chunk_size])
+                s = (q @ postings).tocsr()
+                s.sort_indices()
+                for row in range(s.shape[0]):
+                    lo, hi = s.indptr[row], s.indptr[row + 1]
+                    best = _row_top_k(s.indices[lo:hi], s.data[lo:hi], k, alive)
+                    out.append([(int(ids[r]), sc) for r, sc in best])
+        return out
+
+
+def source_stamp(path):
+    """Path, size and mtime of a source file: any change means a rebuild."""
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _grow(arr, n):
+    # capacity doubling so appends stay amortized O(1)
+    if len(arr) >= n:
+        return arr
+    out = np.zeros(max(n, 2 * len(arr)), dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+
+def _unmapped(a):
+    # a itself, or an in-memory copy if it is (a view of) a memory map
+    base = a
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return np.array(a)
+        base = getattr(base, 'base', None)
+    return a
+
+
+def _with_width(m, n_cols):
+    # older rows were built with a smaller vocabulary
+    if m.shape[1] == n_cols:
+        return m
+    return sparse.csr_matrix((m.data, m.indices, m.indptr), shape=(m.shape[0], n_cols))
+
+
+def _row_top_k(rows, vals, k, alive):
+    # rows outside the sparse result score 0, so it is enough
+    # as long as its k-th best score is still positive
+    if len(rows) >= k:
+        best = top_k(vals, k)
+        if vals[best[-1]] > 0:
+            return [(rows[i], float(vals[i])) for i in best]
+    dense = np.zeros(len(alive))
+    dense[rows] = vals
+    dense[~alive] = -np.inf
+    return [(i, float(dense[i])) for i in top_k(dense, k)]
+
+
+def main(argv):
+    # python tfidf_index.py build <csv> <index_dir> [word|char]
+    if len(argv) not in (4, 5) or argv[1] != 'build':
+        print('usage: python tfidf_index.py build <csv> <index_dir> [word|char]')
+        return 1
+    mode = argv[4] if len(argv) == 5 else 'word'
+    analyzer = Analyzer('char', ngram=3, n_features=2**20) if mode == 'char' else Analyzer(mode)
+    import pandas as pd
+
+    col = pd.read_csv(argv[2]).iloc[:, 0]
+    data = [str(x) for x in col if pd.notna(x) and str(x).strip() != '']
+    index = TfidfIndex(data, analyzer=analyzer)
+    index.source = source_stamp(argv[2])
+    index.save(argv[3])
+    print(f"saved {len(index)} docs, {index.n_terms} terms to {argv[3]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))